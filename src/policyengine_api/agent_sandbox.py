@@ -1,17 +1,25 @@
 """Modal agent using Claude API with tools auto-generated from OpenAPI spec."""
 
-import json
+import contextvars
+import queue
+import random
 import re
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from typing import Callable
 from urllib.parse import quote
 
 import anthropic
 import modal
+import orjson
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 
 image = modal.Image.debian_slim(python_version="3.12").pip_install(
-    "anthropic", "requests", "logfire[httpx]"
+    "anthropic", "cachetools", "requests", "orjson", "logfire[httpx]"
 )
 
 app = modal.App("policyengine-sandbox")
@@ -23,23 +31,249 @@ logfire_secrets = modal.Secret.from_name("policyengine-logfire")
 # and the Modal entry point stay in sync.
 DEFAULT_AGENT_MAX_TURNS = 30
 
+# Hard limit Modal enforces on a run, and the wall-clock budget the agent
+# loop plans against. The margin leaves time to post the result to
+# /agent/complete before Modal kills the container.
+AGENT_RUN_TIMEOUT_SECONDS = 600
+DEFAULT_AGENT_TIME_BUDGET_SECONDS = AGENT_RUN_TIMEOUT_SECONDS - 30
+
+# Upper bound on a single API request made by a tool call.
+API_REQUEST_TIMEOUT_SECONDS = 60
+
+# Upper bound on one attempt at a Claude request, and the least time a turn
+# needs to be worth starting. Each turn's attempt timeout and retry count
+# are fitted to the time remaining, so a slow or retried request cannot
+# outlive the run's budget.
+CLAUDE_REQUEST_TIMEOUT_SECONDS = 120
+CLAUDE_MIN_TURN_SECONDS = 15
+
+# Agent runs spend most of their time waiting on Claude, the API, or the
+# sleep tool between polls. Letting one container interleave several runs
+# on threads means that waiting is shared instead of billed per container.
+AGENT_MAX_CONCURRENT_INPUTS = 8
+
+# Threads for running a turn's tool calls concurrently, shared by every run
+# in the container.
+AGENT_TOOL_WORKERS = 16
+_tool_executor = ThreadPoolExecutor(
+    max_workers=AGENT_TOOL_WORKERS, thread_name_prefix="agent-tool"
+)
+
+# Number of most recent assistant/tool-result exchanges re-sent to Claude on
+# each turn. Older exchanges are replaced by a short placeholder so request
+# size stays bounded instead of growing with every turn of the run.
+AGENT_CONTEXT_WINDOW_TURNS = 6
+
+# Bounds on the prior conversation sent along with a new question. Older
+# messages are dropped first; see ``_bounded_history``.
+AGENT_HISTORY_MAX_MESSAGES = 20
+AGENT_HISTORY_TOKEN_BUDGET = 20_000
+
+_ELIDED_TURNS_MESSAGE = {
+    "role": "user",
+    "content": "[Earlier tool calls and results omitted to save context.]",
+}
+
+
+# Retries for the agent's own HTTP calls to the API. Only gateway errors are
+# retried, and only for methods that are safe to repeat: re-sending a POST
+# could create a duplicate policy or job.
+API_MAX_RETRIES = 3
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"get", "put", "delete"})
+
+# The OpenAPI spec only changes when the API is deployed, so warm containers
+# keep it (and the tools converted from it) per API base URL instead of
+# downloading and converting it at the start of every run.
+SPEC_CACHE_TTL_SECONDS = 300
+_spec_cache_lock = threading.Lock()
+# api_base_url -> (fetched_at, etag, spec)
+_spec_cache: dict[str, tuple[float, str | None, dict]] = {}
+# api_base_url -> (spec, claude_tools, tool_lookup)
+_tools_cache: dict[str, tuple[dict, list[dict], dict[str, dict]]] = {}
+
+# HTTP session for every request the agent makes to the API (tool calls, log
+# lines, the spec and the completion callback), so they reuse keep-alive
+# connections instead of opening a new TCP+TLS connection each time. The pool
+# is sized for ``AGENT_MAX_CONCURRENT_INPUTS`` runs sharing one container.
+# Retries stay in ``send_with_retry``, which knows which methods are safe to
+# repeat.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Log lines are posted to /agent/log_batch by one background thread, so the
+# agent loop never waits on the network for them. The thread collects up to
+# ``LOG_BATCH_SIZE`` lines or ``LOG_BATCH_WINDOW_SECONDS`` worth, whichever
+# comes first, and posts them in the order they were queued.
+# ``_flush_log_posts`` waits for everything queued so far.
+LOG_BATCH_SIZE = 32
+LOG_BATCH_WINDOW_SECONDS = 0.1
+LOG_FLUSH_TIMEOUT_SECONDS = 10
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_thread: threading.Thread | None = None
+_log_thread_lock = threading.Lock()
+
+
+def _deliver_log_posts() -> None:
+    """Post queued log lines in batches forever (runs on the log thread)."""
+    while True:
+        batch = [_log_queue.get()]
+        deadline = time.monotonic() + LOG_BATCH_WINDOW_SECONDS
+        while len(batch) < LOG_BATCH_SIZE and not isinstance(
+            batch[-1], threading.Event
+        ):
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                break
+            try:
+                batch.append(_log_queue.get(timeout=wait))
+            except queue.Empty:
+                break
+        _post_log_batch(batch)
+
+
+def _post_log_batch(batch: list) -> None:
+    """Post a batch of queued lines, one request per run, then wake flushes."""
+    runs: dict[tuple[str, str], tuple[list[str], dict]] = {}
+    flushes = []
+    for item in batch:
+        if isinstance(item, threading.Event):
+            flushes.append(item)
+            continue
+        api_base_url, call_id, message, headers = item
+        runs.setdefault((api_base_url, call_id), ([], headers))[0].append(message)
+
+    for (api_base_url, call_id), (messages, headers) in runs.items():
+        try:
+            resp = _session.post(
+                f"{api_base_url}/agent/log_batch/{call_id}",
+                json={"messages": messages},
+                headers=headers,
+                timeout=5,
+            )
+            if resp.status_code == 404:
+                # API deployed without the batch endpoint: one line at a time
+                for message in messages:
+                    _session.post(
+                        f"{api_base_url}/agent/log/{call_id}",
+                        json={"message": message},
+                        headers=headers,
+                        timeout=5,
+                    )
+        except Exception:
+            pass
+
+    for done in flushes:
+        done.set()
+
+
+def _queue_log_post(
+    api_base_url: str, call_id: str, message: str, headers: dict
+) -> None:
+    """Queue a log line for delivery, starting the log thread if needed."""
+    global _log_thread
+    if _log_thread is None:
+        with _log_thread_lock:
+            if _log_thread is None:
+                _log_thread = threading.Thread(
+                    target=_deliver_log_posts, name="agent-log-posts", daemon=True
+                )
+                _log_thread.start()
+    _log_queue.put((api_base_url, call_id, message, headers))
+
+
+def _flush_log_posts(timeout: float = LOG_FLUSH_TIMEOUT_SECONDS) -> None:
+    """Wait (up to ``timeout``) until every queued log line has been posted."""
+    if _log_thread is None:
+        return
+    done = threading.Event()
+    _log_queue.put(done)
+    done.wait(timeout)
+
+
+# Tool results are re-sent to Claude on every later turn, so a result longer
+# than ``TOOL_RESULT_MAX_CHARS`` is shrunk (see ``_shrink_json``) and, if
+# still too long, cut off.
+TOOL_RESULT_MAX_CHARS = 16_384
+_MAX_STRING_CHARS = 512
+_MAX_OBJECT_ITEMS = 10
+_MAX_SCALAR_ITEMS = 200
+
+# Successful GET results for reference data, which only changes when the
+# API is reseeded, are cached for a couple of seconds so a lookup repeated
+# after an earlier one has answered skips the request. Lookups still in
+# flight are not shared. Anything else, notably status polls, always goes to
+# the API.
+GET_RESULT_TTL_SECONDS = 2
+_CACHEABLE_GET_PREFIXES = (
+    "/parameters",
+    "/parameter-values",
+    "/variables",
+    "/tax-benefit-models",
+    "/datasets",
+    "/regions",
+)
+_get_results_lock = threading.Lock()
+_get_results: TTLCache[tuple[str, bytes], str] = TTLCache(
+    maxsize=128, ttl=GET_RESULT_TTL_SECONDS
+)
+
+_HTTP_METHODS = frozenset({"get", "post", "put", "patch", "delete"})
+_BODY_METHODS = frozenset({"post", "put", "patch"})
+
+# Anthropic client shared across runs in the same process. Created lazily so
+# importing this module does not require ANTHROPIC_API_KEY, and reused so a
+# warm Modal container keeps its HTTP connection pool between invocations.
+_client: anthropic.Anthropic | None = None
+
+# The SDK retries 408/409/429/5xx (including 529 overloaded) with
+# exponential backoff and jitter; raise its default of 2 so a load spike
+# does not end the run.
+ANTHROPIC_MAX_RETRIES = 4
+
+
+def _get_client() -> anthropic.Anthropic:
+    """Return the process-wide Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = anthropic.Anthropic(max_retries=ANTHROPIC_MAX_RETRIES)
+    return _client
+
+
+# Modal runs several agent inputs concurrently in one container (see
+# ``AGENT_MAX_CONCURRENT_INPUTS``), so logfire is configured once per process
+# rather than once per call.
+_logfire_lock = threading.Lock()
+_logfire_configured = False
+
 
 def configure_logfire(traceparent: str | None = None):
-    """Configure logfire with optional trace context propagation."""
+    """Configure logfire with optional trace context propagation.
+
+    Returns the context token when ``traceparent`` was attached so the caller
+    can detach it once the run finishes; otherwise ``None``.
+    """
     import os
 
     import logfire
 
+    global _logfire_configured
+
     token = os.environ.get("LOGFIRE_TOKEN", "")
     if not token:
-        return
-
-    logfire.configure(
-        service_name="policyengine-agent",
-        token=token,
-        environment=os.environ.get("LOGFIRE_ENVIRONMENT", "production"),
-        console=False,
-    )
+        return None
+
+    with _logfire_lock:
+        if not _logfire_configured:
+            logfire.configure(
+                service_name="policyengine-agent",
+                token=token,
+                environment=os.environ.get("LOGFIRE_ENVIRONMENT", "production"),
+                console=False,
+            )
+            _logfire_configured = True
 
     # If traceparent provided, attach to the current context
     if traceparent:
@@ -50,7 +284,8 @@ def configure_logfire(traceparent: str | None = None):
 
         propagator = TraceContextTextMapPropagator()
         ctx = propagator.extract(carrier={"traceparent": traceparent})
-        context.attach(ctx)
+        return context.attach(ctx)
+    return None
 
 
 SYSTEM_PROMPT = """You are a PolicyEngine assistant that helps users understand tax and benefit policies.
@@ -114,6 +349,15 @@ Prefer: specific percentages, pound/dollar amounts, neutral descriptions
 4. When polling async endpoints, use the sleep tool to wait 5-10 seconds between requests
 """
 
+# The system prompt as a cacheable content block. Claude renders tools ahead
+# of the system prompt, so this one breakpoint lets every turn after the
+# first (and repeat questions within the cache TTL) reuse the processed
+# tools + system prefix instead of paying for it again.
+CACHE_CONTROL = {"type": "ephemeral"}
+SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}
+]
+
 # Sleep tool for polling delays
 SLEEP_TOOL = {
     "name": "sleep",
@@ -131,11 +375,78 @@ SLEEP_TOOL = {
 }
 
 
+def _sleep_tool(tool_input: dict, log_fn: Callable, time_left: float) -> str:
+    """Handle the sleep tool, never sleeping past the run's time budget."""
+    seconds = min(max(tool_input.get("seconds", 5), 1), 60, time_left)
+    log_fn(f"[SLEEP] Waiting {seconds} seconds...")
+    time.sleep(seconds)
+    return f"Slept for {seconds} seconds"
+
+
+# Tools answered inside the agent rather than by an API request, keyed by
+# name. Each handler takes the tool input, the log function and the seconds
+# left in the run's time budget.
+LOCAL_TOOL_HANDLERS: dict[str, Callable[[dict, Callable, float], str]] = {
+    "sleep": _sleep_tool,
+}
+
+
 def fetch_openapi_spec(api_base_url: str) -> dict:
-    """Fetch and cache OpenAPI spec."""
-    resp = requests.get(f"{api_base_url}/openapi.json", timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    """Fetch and cache OpenAPI spec.
+
+    A cached spec younger than ``SPEC_CACHE_TTL_SECONDS`` is returned without
+    a request. Older ones are revalidated with ``If-None-Match`` when the
+    server sent an ETag. Whenever the spec is unchanged the cached object
+    itself is returned, so tools derived from it can be reused as well.
+    """
+    with _spec_cache_lock:
+        cached = _spec_cache.get(api_base_url)
+    if cached and time.monotonic() - cached[0] < SPEC_CACHE_TTL_SECONDS:
+        return cached[2]
+
+    headers = {}
+    if cached and cached[1]:
+        headers["If-None-Match"] = cached[1]
+    resp = _session.get(f"{api_base_url}/openapi.json", headers=headers, timeout=30)
+    if cached and resp.status_code == 304:
+        spec = cached[2]
+    else:
+        resp.raise_for_status()
+        spec = orjson.loads(resp.content)
+        if cached and spec == cached[2]:
+            spec = cached[2]
+
+    etag = resp.headers.get("ETag") or (cached[1] if cached else None)
+    with _spec_cache_lock:
+        _spec_cache[api_base_url] = (time.monotonic(), etag, spec)
+    return spec
+
+
+def build_agent_tools(
+    api_base_url: str, spec: dict
+) -> tuple[list[dict], dict[str, dict]]:
+    """Return ``(claude_tools, tool_lookup)`` for ``spec``.
+
+    The conversion is reused for as long as ``fetch_openapi_spec`` keeps
+    returning the same spec object for ``api_base_url``. The returned
+    structures are shared between runs and must not be mutated.
+    """
+    with _spec_cache_lock:
+        cached = _tools_cache.get(api_base_url)
+    if cached and cached[0] is spec:
+        return cached[1], cached[2]
+
+    tools = openapi_to_claude_tools(spec)
+    # Create tool lookup for execution
+    tool_lookup = {t["name"]: t for t in tools}
+    # Strip _meta from tools before sending to Claude (it doesn't need it)
+    claude_tools = [{k: v for k, v in t.items() if k != "_meta"} for t in tools]
+    # Add the sleep tool
+    claude_tools.append(SLEEP_TOOL)
+
+    with _spec_cache_lock:
+        _tools_cache[api_base_url] = (spec, claude_tools, tool_lookup)
+    return claude_tools, tool_lookup
 
 
 def resolve_ref(spec: dict, ref: str) -> dict:
@@ -149,10 +460,27 @@ def resolve_ref(spec: dict, ref: str) -> dict:
     return result
 
 
-def schema_to_json_schema(spec: dict, schema: dict) -> dict:
-    """Convert OpenAPI schema to JSON Schema for Claude tools."""
+def schema_to_json_schema(spec: dict, schema: dict, cache: dict | None = None) -> dict:
+    """Convert OpenAPI schema to JSON Schema for Claude tools.
+
+    ``cache`` maps ``$ref`` strings to their converted schema so a model
+    referenced many times is converted once. Cached results are shared
+    between callers and must not be mutated.
+    """
     if "$ref" in schema:
-        schema = resolve_ref(spec, schema["$ref"])
+        ref = schema["$ref"]
+        if cache is None:
+            return _convert_schema(spec, resolve_ref(spec, ref), cache)
+        if ref not in cache:
+            cache[ref] = _convert_schema(spec, resolve_ref(spec, ref), cache)
+        return cache[ref]
+    return _convert_schema(spec, schema, cache)
+
+
+def _convert_schema(spec: dict, schema: dict, cache: dict | None) -> dict:
+    """Convert a schema that is not itself a ``$ref``."""
+    if not schema:
+        return {}
 
     result = {}
 
@@ -174,16 +502,15 @@ def schema_to_json_schema(spec: dict, schema: dict) -> dict:
 
     # Handle anyOf (often used for Optional types)
     if "anyOf" in schema:
-        non_null = [s for s in schema["anyOf"] if s.get("type") != "null"]
-        if len(non_null) == 1:
-            result.update(schema_to_json_schema(spec, non_null[0]))
-        elif non_null:
-            result.update(schema_to_json_schema(spec, non_null[0]))
+        # Only the first non-null alternative is described to Claude
+        non_null = next((s for s in schema["anyOf"] if s.get("type") != "null"), None)
+        if non_null is not None:
+            result.update(schema_to_json_schema(spec, non_null, cache))
 
     # Handle allOf
     if "allOf" in schema:
         for sub in schema["allOf"]:
-            result.update(schema_to_json_schema(spec, sub))
+            result.update(schema_to_json_schema(spec, sub, cache))
 
     # Handle objects
     if schema.get("type") == "object" or "properties" in schema:
@@ -192,32 +519,55 @@ def schema_to_json_schema(spec: dict, schema: dict) -> dict:
             result["properties"] = {}
             for prop_name, prop_schema in schema["properties"].items():
                 result["properties"][prop_name] = schema_to_json_schema(
-                    spec, prop_schema
+                    spec, prop_schema, cache
                 )
         if "required" in schema:
             result["required"] = schema["required"]
 
     # Handle arrays
     if schema.get("type") == "array" and "items" in schema:
-        result["items"] = schema_to_json_schema(spec, schema["items"])
+        result["items"] = schema_to_json_schema(spec, schema["items"], cache)
 
     return result
 
 
+# Tool names may only contain letters, digits and underscores
+_NON_IDENTIFIER_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+_REPEATED_UNDERSCORES = re.compile(r"_+")
+
+
+def _split_parameters(parameters: list[dict]) -> dict:
+    """Group an operation's parameters by location for ``execute_api_tool``.
+
+    Done once when the tools are built, so executing a call does not rescan
+    the operation's parameter list.
+    """
+    return {
+        "path_params": tuple(p["name"] for p in parameters if p.get("in") == "path"),
+        "query_params": tuple(p["name"] for p in parameters if p.get("in") == "query"),
+        "header_params": tuple(
+            p["name"] for p in parameters if p.get("in") == "header"
+        ),
+        "param_names": frozenset(p.get("name") for p in parameters),
+    }
+
+
 def openapi_to_claude_tools(spec: dict) -> list[dict]:
     """Convert OpenAPI spec to Claude tool definitions."""
     tools = []
+    # Shared by every operation, so each referenced model is converted once
+    schema_cache: dict[str, dict] = {}
 
     for path, methods in spec.get("paths", {}).items():
         for method, operation in methods.items():
-            if method not in ("get", "post", "put", "patch", "delete"):
+            if method not in _HTTP_METHODS:
                 continue
 
             # Build tool name from operationId or path+method
             op_id = operation.get("operationId", f"{method}_{path}")
             # Clean up the name
-            tool_name = re.sub(r"[^a-zA-Z0-9_]", "_", op_id)
-            tool_name = re.sub(r"_+", "_", tool_name).strip("_")
+            tool_name = _NON_IDENTIFIER_CHARS.sub("_", op_id)
+            tool_name = _REPEATED_UNDERSCORES.sub("_", tool_name).strip("_")
 
             # Build description
             summary = operation.get("summary", "")
@@ -239,7 +589,8 @@ def openapi_to_claude_tools(spec: dict) -> list[dict]:
                 param_schema = param.get("schema", {})
                 param_required = param.get("required", False)
 
-                prop = schema_to_json_schema(spec, param_schema)
+                # Copy: the converted schema may be shared via the cache
+                prop = dict(schema_to_json_schema(spec, param_schema, schema_cache))
                 prop["description"] = (
                     param.get("description", "") + f" (in: {param_in})"
                 )
@@ -256,7 +607,7 @@ def openapi_to_claude_tools(spec: dict) -> list[dict]:
                 body_schema = json_content.get("schema", {})
 
                 if body_schema:
-                    resolved = schema_to_json_schema(spec, body_schema)
+                    resolved = schema_to_json_schema(spec, body_schema, schema_cache)
                     # Flatten body properties into tool properties
                     if "properties" in resolved:
                         for prop_name, prop_schema in resolved["properties"].items():
@@ -271,7 +622,9 @@ def openapi_to_claude_tools(spec: dict) -> list[dict]:
 
             input_schema = {"type": "object", "properties": properties}
             if required:
-                input_schema["required"] = list(set(required))
+                # Order-preserving dedup keeps the tools payload identical
+                # across runs, which prompt caching depends on.
+                input_schema["required"] = list(dict.fromkeys(required))
 
             tools.append(
                 {
@@ -281,7 +634,7 @@ def openapi_to_claude_tools(spec: dict) -> list[dict]:
                     "_meta": {
                         "path": path,
                         "method": method,
-                        "parameters": operation.get("parameters", []),
+                        **_split_parameters(operation.get("parameters", [])),
                     },
                 }
             )
@@ -289,18 +642,121 @@ def openapi_to_claude_tools(spec: dict) -> list[dict]:
     return tools
 
 
+def send_with_retry(
+    send: Callable[[], requests.Response],
+    retry: bool = True,
+    deadline: float | None = None,
+) -> requests.Response:
+    """Call ``send``, retrying transient gateway errors with backoff.
+
+    Connection errors, timeouts and ``_RETRY_STATUSES`` responses are retried
+    up to ``API_MAX_RETRIES`` times with exponential backoff and full jitter.
+    With ``retry=False`` the request is sent exactly once, for requests that
+    are not safe to repeat. ``deadline`` is a ``time.monotonic()`` value; no
+    backoff sleeps past it, and the last failure is returned or raised
+    instead.
+    """
+    max_retries = API_MAX_RETRIES if retry else 0
+    attempt = 0
+    while True:
+        delay = random.uniform(0, min(8.0, 0.5 * 2**attempt))
+        try:
+            resp = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries or _past_deadline(deadline, delay):
+                raise
+        else:
+            if (
+                resp.status_code not in _RETRY_STATUSES
+                or attempt >= max_retries
+                or _past_deadline(deadline, delay)
+            ):
+                return resp
+        time.sleep(delay)
+        attempt += 1
+
+
+def _past_deadline(deadline: float | None, delay: float) -> bool:
+    """Whether sleeping ``delay`` seconds would reach ``deadline``."""
+    return deadline is not None and time.monotonic() + delay >= deadline
+
+
+def validate_tool_input(input_schema: dict, tool_input: dict) -> str | None:
+    """Check tool input against the tool's schema before making a request.
+
+    Only the checks that catch common model mistakes are applied: missing
+    required fields and values outside an ``enum``. Returns an error message,
+    or ``None`` if the input looks valid. Anything subtler is left for the
+    API to reject.
+    """
+    missing = [
+        name for name in input_schema.get("required", ()) if name not in tool_input
+    ]
+    if missing:
+        return f"missing required field(s): {', '.join(missing)}"
+
+    properties = input_schema.get("properties", {})
+    for name, value in tool_input.items():
+        allowed = properties.get(name, {}).get("enum")
+        if allowed is not None and value is not None and value not in allowed:
+            return f"{name} must be one of {allowed}, got {value!r}"
+
+    return None
+
+
+def _shrink_json(value):
+    """Return ``value`` with long strings and long nested lists cut down.
+
+    Strings over ``_MAX_STRING_CHARS`` are replaced by a marker. Lists of
+    objects keep their first ``_MAX_OBJECT_ITEMS`` entries and lists of
+    scalars their first ``_MAX_SCALAR_ITEMS``, followed by a count of what
+    was dropped.
+    """
+    if isinstance(value, str):
+        if len(value) > _MAX_STRING_CHARS:
+            return f"<truncated: {len(value)} chars>"
+        return value
+    if isinstance(value, dict):
+        return {k: _shrink_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        nested = bool(value) and isinstance(value[0], (dict, list))
+        limit = _MAX_OBJECT_ITEMS if nested else _MAX_SCALAR_ITEMS
+        shrunk = [_shrink_json(v) for v in value[:limit]]
+        if len(value) > limit:
+            shrunk.append(f"... ({len(value) - limit} more items)")
+        return shrunk
+    return value
+
+
+def _json_preview(value, limit: int = 200) -> str:
+    """Return the first ``limit`` bytes of ``value`` as JSON, for log lines."""
+    return orjson.dumps(value)[:limit].decode(errors="replace")
+
+
 def execute_api_tool(
     tool: dict,
     tool_input: dict,
     api_base_url: str,
     log_fn: Callable,
     trace_headers: dict | None = None,
+    timeout: float = API_REQUEST_TIMEOUT_SECONDS,
+    deadline: float | None = None,
 ) -> str:
-    """Execute an API tool by making the HTTP request."""
+    """Execute an API tool by making the HTTP request.
+
+    ``deadline`` bounds retry backoff; see ``send_with_retry``.
+    """
+    error = validate_tool_input(tool.get("input_schema", {}), tool_input)
+    if error:
+        # Answer locally: the request would only come back as a 422.
+        log_fn(f"[API] Invalid arguments: {error}")
+        return f"Invalid arguments: {error}"
+
     meta = tool.get("_meta", {})
     path = meta.get("path", "")
     method = meta.get("method", "get")
-    parameters = meta.get("parameters", [])
+    if "param_names" not in meta:
+        meta = {**meta, **_split_parameters(meta.get("parameters", []))}
 
     # Build URL with path parameters
     url = f"{api_base_url}{path}"
@@ -310,79 +766,150 @@ def execute_api_tool(
         headers.update(trace_headers)
 
     # Separate path, query, and body parameters
-    body_data = {}
-    for param in parameters:
-        param_name = param.get("name")
-        param_in = param.get("in")
+    for param_name in meta["path_params"]:
         value = tool_input.get(param_name)
-
-        if value is None:
-            continue
-
-        if param_in == "path":
+        if value is not None:
             # URL-encode path parameters so values containing '/', '#', etc.
             # do not escape the path segment or collide with other routes.
             url = url.replace(f"{{{param_name}}}", quote(str(value), safe=""))
-        elif param_in == "query":
+    for param_name in meta["query_params"]:
+        value = tool_input.get(param_name)
+        if value is not None:
             query_params[param_name] = value
-        elif param_in == "header":
+    for param_name in meta["header_params"]:
+        value = tool_input.get(param_name)
+        if value is not None:
             headers[param_name] = str(value)
 
     # Remaining input goes to body (for POST/PUT/PATCH)
-    param_names = {p.get("name") for p in parameters}
-    for key, value in tool_input.items():
-        if key not in param_names:
-            body_data[key] = value
+    param_names = meta["param_names"]
+    body_data = {k: v for k, v in tool_input.items() if k not in param_names}
 
     try:
         log_fn(f"[API] {method.upper()} {url}")
         if query_params:
-            log_fn(f"[API] Query: {json.dumps(query_params)[:200]}")
+            log_fn(f"[API] Query: {_json_preview(query_params)}")
         if body_data:
-            log_fn(f"[API] Body: {json.dumps(body_data)[:200]}")
+            log_fn(f"[API] Body: {_json_preview(body_data)}")
 
-        if method == "get":
-            resp = requests.get(url, params=query_params, headers=headers, timeout=60)
-        elif method == "post":
-            resp = requests.post(
-                url, params=query_params, json=body_data, headers=headers, timeout=60
-            )
-        elif method == "put":
-            resp = requests.put(
-                url, params=query_params, json=body_data, headers=headers, timeout=60
-            )
-        elif method == "patch":
-            resp = requests.patch(
-                url, params=query_params, json=body_data, headers=headers, timeout=60
-            )
-        elif method == "delete":
-            resp = requests.delete(
-                url, params=query_params, headers=headers, timeout=60
-            )
-        else:
+        if method not in _HTTP_METHODS:
             return f"Unsupported method: {method}"
 
+        cache_key = None
+        if method == "get" and path.startswith(_CACHEABLE_GET_PREFIXES):
+            header_values = [headers[name] for name in meta["header_params"]]
+            cache_key = (url, orjson.dumps([query_params, header_values]))
+            with _get_results_lock:
+                cached = _get_results.get(cache_key)
+            if cached is not None:
+                log_fn("[API] Reusing response from an identical recent request")
+                return cached
+        send = partial(
+            _session.request,
+            method.upper(),
+            url,
+            params=query_params,
+            # Pre-encoded with orjson; the Content-Type header is already set
+            data=orjson.dumps(body_data) if method in _BODY_METHODS else None,
+            headers=headers,
+            timeout=timeout,
+        )
+
+        resp = send_with_retry(
+            send, retry=method in _IDEMPOTENT_METHODS, deadline=deadline
+        )
+
         log_fn(f"[API] Response: {resp.status_code}")
 
         if resp.status_code >= 400:
             return f"Error {resp.status_code}: {resp.text[:500]}"
 
         try:
-            data = resp.json()
-            # For lists, summarize if too long but keep key info
-            if isinstance(data, list) and len(data) > 50:
-                result = json.dumps(data[:50], indent=2)
-                result += f"\n... ({len(data) - 50} more items)"
-            else:
-                result = json.dumps(data, indent=2)
-            return result
-        except json.JSONDecodeError:
+            data = orjson.loads(resp.content)
+        except orjson.JSONDecodeError:
             return resp.text[:1000]
 
+        # Compact JSON: indentation only adds tokens to every later turn
+        # that re-sends this result, and Claude reads it just as well.
+        # For lists, summarize if too long but keep key info
+        if isinstance(data, list) and len(data) > 50:
+            result = orjson.dumps(data[:50]).decode()
+            result += f"\n... ({len(data) - 50} more items)"
+        else:
+            result = orjson.dumps(data).decode()
+
+        if len(result) > TOOL_RESULT_MAX_CHARS:
+            result = orjson.dumps(_shrink_json(data)).decode()
+        if len(result) > TOOL_RESULT_MAX_CHARS:
+            cut = len(result) - TOOL_RESULT_MAX_CHARS
+            result = result[:TOOL_RESULT_MAX_CHARS] + f"\n... (truncated {cut} chars)"
+
+        if cache_key is not None:
+            with _get_results_lock:
+                _get_results[cache_key] = result
+        return result
+
     except requests.RequestException as e:
         return f"Request error: {str(e)}"
 
 
+def _bounded_history(history: list[dict]) -> list[dict]:
+    """Return the most recent slice of ``history`` that fits the budget.
+
+    At most ``AGENT_HISTORY_MAX_MESSAGES`` messages are kept, and older ones
+    are dropped until the rough token estimate (four characters per token)
+    is within ``AGENT_HISTORY_TOKEN_BUDGET``. The result always starts with
+    a user message, as the Messages API expects.
+    """
+    messages = [
+        {"role": m["role"], "content": m["content"]}
+        for m in history[-AGENT_HISTORY_MAX_MESSAGES:]
+    ]
+    tokens = sum(len(m["content"]) // 4 for m in messages)
+    start = 0
+    while start < len(messages) and (
+        tokens > AGENT_HISTORY_TOKEN_BUDGET or messages[start]["role"] != "user"
+    ):
+        tokens -= len(messages[start]["content"]) // 4
+        start += 1
+    return messages[start:]
+
+
+def _claude_request_options(budget: float) -> dict:
+    """Fit a Claude request's timeout and retries into ``budget`` seconds.
+
+    Every attempt, retried or not, may use up to the attempt timeout, so the
+    retry count is cut until all attempts together fit the budget.
+    """
+    timeout = min(CLAUDE_REQUEST_TIMEOUT_SECONDS, budget)
+    retries = min(ANTHROPIC_MAX_RETRIES, max(int(budget // timeout) - 1, 0))
+    return {"timeout": timeout, "max_retries": retries}
+
+
+def _trim_agent_turns(
+    messages: list[dict], head: int, keep_turns: int = AGENT_CONTEXT_WINDOW_TURNS
+) -> None:
+    """Bound the exchanges after ``messages[:head]`` to ``2 * keep_turns``.
+
+    ``messages[:head]`` (conversation history plus the question) is never
+    touched. Everything after it is a sequence of assistant/tool-result
+    pairs, optionally preceded by the elision placeholder from an earlier
+    trim. Whole pairs are dropped so every kept ``tool_result`` still follows
+    the assistant message containing its ``tool_use``.
+
+    Trimming happens in blocks: once more than ``2 * keep_turns`` exchanges
+    have built up, they are cut back to the last ``keep_turns``. The prefix
+    sent to Claude then stays identical for the next ``keep_turns`` turns, so
+    the prompt cache is read instead of rewritten on every turn.
+    """
+    window = 2 * keep_turns
+    tail = len(messages) - head
+    if tail and messages[head] is _ELIDED_TURNS_MESSAGE:
+        tail -= 1
+    if tail > 2 * window:
+        messages[head:] = [_ELIDED_TURNS_MESSAGE, *messages[-window:]]
+
+
 def _run_agent_impl(
     question: str,
     api_base_url: str = "https://v2.api.policyengine.org",
@@ -390,10 +917,23 @@ def _run_agent_impl(
     history: list[dict] | None = None,
     max_turns: int = DEFAULT_AGENT_MAX_TURNS,
     traceparent: str | None = None,
+    time_budget: float = DEFAULT_AGENT_TIME_BUDGET_SECONDS,
 ) -> dict:
-    """Core agent implementation."""
+    """Core agent implementation.
+
+    The loop stops starting new turns once less than
+    ``CLAUDE_MIN_TURN_SECONDS`` of ``time_budget`` is left. Every sleep, API
+    request and Claude request inside a turn is capped to the time remaining
+    (Claude's attempts and retries together), so the run finishes and
+    reports completion on time.
+    """
     import logfire
 
+    deadline = time.monotonic() + time_budget
+
+    def remaining() -> float:
+        return max(deadline - time.monotonic(), 0.0)
+
     # Get traceparent for HTTP requests
     def get_trace_headers() -> dict:
         if traceparent:
@@ -404,126 +944,166 @@ def _run_agent_impl(
         logfire.info("agent_log", message=msg, call_id=call_id)
         print(msg)
         if call_id:
-            try:
-                requests.post(
-                    f"{api_base_url}/agent/log/{call_id}",
-                    json={"message": msg},
-                    headers=get_trace_headers(),
-                    timeout=5,
-                )
-            except Exception:
-                pass
-
-    log(f"[AGENT] Starting: {question[:200]}")
-
-    # Fetch and convert OpenAPI spec to tools
-    log("[AGENT] Fetching OpenAPI spec...")
-    spec = fetch_openapi_spec(api_base_url)
-    tools = openapi_to_claude_tools(spec)
-    log(f"[AGENT] Loaded {len(tools)} API tools")
-
-    # Create tool lookup for execution
-    tool_lookup = {t["name"]: t for t in tools}
-
-    # Strip _meta from tools before sending to Claude (it doesn't need it)
-    claude_tools = [{k: v for k, v in t.items() if k != "_meta"} for t in tools]
-    # Add the sleep tool
-    claude_tools.append(SLEEP_TOOL)
-
-    client = anthropic.Anthropic()
+            _queue_log_post(api_base_url, call_id, msg, get_trace_headers())
 
-    # Build messages with conversation history
-    messages = []
-    if history:
-        for msg in history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-    messages.append({"role": "user", "content": question})
-
-    final_response = None
-    turns = 0
+    # Reported to /agent/complete however the run ends, so a crash frees the
+    # run's slot instead of leaving it "running" until the entry expires.
+    result = {"status": "failed", "error": "Agent run ended unexpectedly"}
+    try:
+        log(f"[AGENT] Starting: {question[:200]}")
 
-    while turns < max_turns:
-        turns += 1
-        log(f"[AGENT] Turn {turns}")
+        # Fetch and convert OpenAPI spec to tools
+        log("[AGENT] Fetching OpenAPI spec...")
+        spec = fetch_openapi_spec(api_base_url)
+        claude_tools, tool_lookup = build_agent_tools(api_base_url, spec)
+        log(f"[AGENT] Loaded {len(tool_lookup)} API tools")
 
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            system=SYSTEM_PROMPT,
-            tools=claude_tools,
-            messages=messages,
-        )
+        client = _get_client()
 
-        log(f"[AGENT] Stop reason: {response.stop_reason}")
-
-        assistant_content = []
-        tool_results = []
-
-        for block in response.content:
-            if block.type == "text":
-                log(f"[ASSISTANT] {block.text[:500]}")
-                assistant_content.append(block)
-                final_response = block.text
-            elif block.type == "tool_use":
-                log(f"[TOOL_USE] {block.name}: {json.dumps(block.input)[:200]}")
-                assistant_content.append(block)
-
-                # Execute tool
-                if block.name == "sleep":
-                    # Handle sleep tool specially
-                    seconds = min(max(block.input.get("seconds", 5), 1), 60)
-                    log(f"[SLEEP] Waiting {seconds} seconds...")
-                    time.sleep(seconds)
-                    result = f"Slept for {seconds} seconds"
+        def run_tool(block) -> str:
+            """Execute one ``tool_use`` block and return its result text."""
+            local_tool = LOCAL_TOOL_HANDLERS.get(block.name)
+            if local_tool is not None:
+                result = local_tool(block.input, log, remaining())
+            else:
+                tool = tool_lookup.get(block.name)
+                if tool:
+                    result = execute_api_tool(
+                        tool,
+                        block.input,
+                        api_base_url,
+                        log,
+                        get_trace_headers(),
+                        timeout=max(min(API_REQUEST_TIMEOUT_SECONDS, remaining()), 1),
+                        deadline=deadline,
+                    )
                 else:
-                    tool = tool_lookup.get(block.name)
-                    if tool:
-                        result = execute_api_tool(
-                            tool, block.input, api_base_url, log, get_trace_headers()
-                        )
-                    else:
-                        result = f"Unknown tool: {block.name}"
-
-                log(f"[TOOL_RESULT] {result[:300]}")
-
-                tool_results.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result,
-                    }
-                )
+                    result = f"Unknown tool: {block.name}"
 
-        messages.append({"role": "assistant", "content": assistant_content})
+            log(f"[TOOL_RESULT] {result[:300]}")
+            return result
 
-        if tool_results:
+        # Build messages with conversation history
+        messages = _bounded_history(history or [])
+        messages.append({"role": "user", "content": question})
+        head = len(messages)
+
+        final_response = None
+        cached_result = None
+        turns = 0
+
+        while turns < max_turns:
+            budget = remaining()
+            if budget < CLAUDE_MIN_TURN_SECONDS:
+                log("[AGENT] Time budget exhausted, stopping")
+                break
+            turns += 1
+            log(f"[AGENT] Turn {turns}")
+            turn_client = client.with_options(**_claude_request_options(budget))
+
+            # Stream the turn so each content block is logged as soon as it is
+            # complete, and each tool call starts while the rest of the turn
+            # is still being generated. Calls Claude makes in the same turn
+            # are independent, so they run concurrently; once a sleep appears,
+            # it and every later call wait for the stream and run in order so
+            # the sleep still separates the polls around it.
+            started: dict[str, Future] = {}
+            speculate = True
+            with turn_client.messages.stream(
+                model="claude-sonnet-4-20250514",
+                max_tokens=4096,
+                system=SYSTEM_BLOCKS,
+                tools=claude_tools,
+                messages=messages,
+            ) as stream:
+                for event in stream:
+                    if event.type != "content_block_stop":
+                        continue
+                    block = event.content_block
+                    if block.type == "text":
+                        log(f"[ASSISTANT] {block.text[:500]}")
+                    elif block.type == "tool_use":
+                        log(f"[TOOL_USE] {block.name}: {_json_preview(block.input)}")
+                        if block.name == "sleep":
+                            speculate = False
+                        elif speculate:
+                            started[block.id] = _tool_executor.submit(
+                                contextvars.copy_context().run, run_tool, block
+                            )
+                response = stream.get_final_message()
+
+            log(f"[AGENT] Stop reason: {response.stop_reason}")
+
+            assistant_content = []
+            tool_uses = []
+
+            for block in response.content:
+                if block.type == "text":
+                    assistant_content.append(block)
+                    final_response = block.text
+                elif block.type == "tool_use":
+                    assistant_content.append(block)
+                    tool_uses.append(block)
+
+            messages.append({"role": "assistant", "content": assistant_content})
+
+            if not tool_uses:
+                break
+
+            results = [
+                started[b.id].result() if b.id in started else run_tool(b)
+                for b in tool_uses
+            ]
+
+            tool_results = [
+                {"type": "tool_result", "tool_use_id": block.id, "content": result}
+                for block, result in zip(tool_uses, results)
+            ]
+            # Move the conversation's cache breakpoint to the newest tool result
+            # so the next turn reads everything before it from the prompt cache
+            # instead of reprocessing earlier results. Only one is kept: a
+            # request may carry at most four breakpoints.
+            if cached_result is not None:
+                del cached_result["cache_control"]
+            cached_result = tool_results[-1]
+            cached_result["cache_control"] = CACHE_CONTROL
             messages.append({"role": "user", "content": tool_results})
-        else:
-            break
-
-    log(f"[AGENT] Completed in {turns} turns")
-
-    result = {
-        "status": "completed",
-        "result": final_response,
-        "turns": turns,
-    }
-
-    if call_id:
-        try:
-            requests.post(
-                f"{api_base_url}/agent/complete/{call_id}",
-                json=result,
-                headers=get_trace_headers(),
-                timeout=10,
-            )
-        except Exception:
-            pass
+            _trim_agent_turns(messages, head)
+
+        log(f"[AGENT] Completed in {turns} turns")
+
+        result = {
+            "status": "completed",
+            "result": final_response,
+            "turns": turns,
+        }
+    except Exception as e:
+        result = {"status": "failed", "error": str(e)}
+        raise
+    finally:
+        if call_id:
+            # Deliver outstanding log lines first so clients that stop
+            # polling once the run completes still see the full log.
+            _flush_log_posts()
+            try:
+                _session.post(
+                    f"{api_base_url}/agent/complete/{call_id}",
+                    json=result,
+                    headers=get_trace_headers(),
+                    timeout=10,
+                )
+            except Exception:
+                pass
 
     return result
 
 
-@app.function(image=image, secrets=[anthropic_secret, logfire_secrets], timeout=600)
+@app.function(
+    image=image,
+    secrets=[anthropic_secret, logfire_secrets],
+    timeout=AGENT_RUN_TIMEOUT_SECONDS,
+)
+@modal.concurrent(max_inputs=AGENT_MAX_CONCURRENT_INPUTS)
 def run_agent(
     question: str,
     api_base_url: str = "https://v2.api.policyengine.org",
@@ -535,17 +1115,25 @@ def run_agent(
     """Run agentic loop to answer a policy question (Modal wrapper)."""
     import logfire
 
-    configure_logfire(traceparent)
+    context_token = configure_logfire(traceparent)
 
-    with logfire.span("run_agent", call_id=call_id, question=question[:200]):
-        result = _run_agent_impl(
-            question,
-            api_base_url,
-            call_id,
-            history=history,
-            max_turns=max_turns,
-            traceparent=traceparent,
-        )
+    try:
+        with logfire.span("run_agent", call_id=call_id, question=question[:200]):
+            result = _run_agent_impl(
+                question,
+                api_base_url,
+                call_id,
+                history=history,
+                max_turns=max_turns,
+                traceparent=traceparent,
+            )
+    finally:
+        # Input threads are reused, so don't leak this run's trace context
+        # into the next input handled on the same thread.
+        if context_token is not None:
+            from opentelemetry import context
+
+            context.detach(context_token)
 
     # Ensure logfire sends all spans before Modal container exits
     logfire.force_flush()
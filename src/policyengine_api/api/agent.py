@@ -7,24 +7,38 @@ The agent runs in a Modal sandbox (production) or locally (development).
 """
 
 import asyncio
+import functools
+import itertools
 import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Callable, NamedTuple
 
 import logfire
 from cachetools import TTLCache
-from fastapi import APIRouter, Depends, HTTPException
-from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from opentelemetry import trace
+from pydantic import BaseModel, ConfigDict, Field
 
+from policyengine_api.agent_sandbox import AGENT_RUN_TIMEOUT_SECONDS
 from policyengine_api.config import settings
 from policyengine_api.security import issue_signed_call_id, verified_call_id
 
 
 def get_traceparent() -> str | None:
-    """Get the current W3C traceparent header for distributed tracing."""
-    carrier: dict[str, str] = {}
-    TraceContextTextMapPropagator().inject(carrier)
-    return carrier.get("traceparent")
+    """Get the current W3C traceparent header for distributed tracing.
+
+    Formatted straight from the current span context. Returns ``None`` for
+    unsampled spans so the agent does not continue a trace that is dropped.
+    """
+    ctx = trace.get_current_span().get_span_context()
+    if not ctx.is_valid or not ctx.trace_flags.sampled:
+        return None
+    return f"00-{ctx.trace_id:032x}-{ctx.span_id:016x}-{ctx.trace_flags:02x}"
 
 
 router = APIRouter(prefix="/agent", tags=["agent"])
@@ -33,6 +47,8 @@ router = APIRouter(prefix="/agent", tags=["agent"])
 class ConversationMessage(BaseModel):
     """A message in the conversation history."""
 
+    model_config = ConfigDict(frozen=True)
+
     role: str  # "user" or "assistant"
     content: str
 
@@ -54,10 +70,56 @@ class RunResponse(BaseModel):
 class LogEntry(BaseModel):
     """A single log entry."""
 
+    model_config = ConfigDict(frozen=True)
+
     timestamp: str
     message: str
 
 
+class _LogRecord(NamedTuple):
+    """A log line as stored: the receive time is only formatted when read."""
+
+    timestamp_ns: int
+    message: str
+
+
+def _to_log_entry(record: _LogRecord) -> dict:
+    """Render a stored record in the ``LogEntry`` shape."""
+    timestamp = datetime.fromtimestamp(record.timestamp_ns / 1e9, tz=timezone.utc)
+    return {"timestamp": timestamp.isoformat(), "message": record.message}
+
+
+class _LogBuffer(deque):
+    """A call's most recent log records, counting the older ones it dropped.
+
+    Sequence numbers stay absolute: the first record held is number
+    ``dropped`` and the next one appended will be ``next_seq``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(maxlen=settings.agent_max_logs_per_call)
+        self.dropped = 0
+
+    @property
+    def next_seq(self) -> int:
+        return self.dropped + len(self)
+
+    def append(self, record: _LogRecord) -> None:
+        self.extend((record,))
+
+    def extend(self, records) -> None:
+        records = tuple(records)
+        self.dropped += max(0, len(self) + len(records) - self.maxlen)
+        super().extend(records)
+
+    def since(self, seq: int, limit: int | None = None) -> list[_LogRecord]:
+        """Records numbered ``seq`` or later, only the last ``limit`` if set."""
+        start = max(0, seq - self.dropped)
+        if limit is not None:
+            start = max(start, len(self) - limit)
+        return list(itertools.islice(self, start, None))
+
+
 class LogsResponse(BaseModel):
     """Response with logs for a function call."""
 
@@ -65,14 +127,32 @@ class LogsResponse(BaseModel):
     status: str  # "running", "completed", "failed"
     logs: list[LogEntry]
     result: dict | None = None
+    # Pass as ``since_seq`` on the next request to receive only newer logs
+    next_seq: int = 0
+    # True when older lines were dropped to bound memory per call
+    truncated: bool = False
 
 
 class LogInput(BaseModel):
     """Input for logging an entry."""
 
+    model_config = ConfigDict(frozen=True)
+
     message: str
 
 
+# Largest number of lines accepted by one /agent/log_batch request.
+MAX_LOG_BATCH_SIZE = 100
+
+
+class LogBatchInput(BaseModel):
+    """Input for logging several entries in one request."""
+
+    model_config = ConfigDict(frozen=True)
+
+    messages: list[str] = Field(max_length=MAX_LOG_BATCH_SIZE)
+
+
 class StatusResponse(BaseModel):
     """Response with job status."""
 
@@ -96,13 +176,120 @@ class StatusResponse(BaseModel):
 _MAX_ACTIVE_CALLS = 2048
 _CALL_TTL_SECONDS = 60 * 60  # 1 hour
 
+# A run holds an admission slot for at most this long. Modal kills the
+# sandbox after ``AGENT_RUN_TIMEOUT_SECONDS``, and a killed or crashed run
+# never posts /agent/complete, so older "running" entries must not count
+# towards ``agent_max_concurrent_runs``. The grace period covers spawn
+# latency and the final /agent/complete post.
+_RUN_SLOT_GRACE_SECONDS = 60
+_RUN_SLOT_SECONDS = AGENT_RUN_TIMEOUT_SECONDS + _RUN_SLOT_GRACE_SECONDS
+
 _cache_lock = threading.Lock()
 _calls: TTLCache[str, dict] = TTLCache(maxsize=_MAX_ACTIVE_CALLS, ttl=_CALL_TTL_SECONDS)
-_logs: TTLCache[str, list[LogEntry]] = TTLCache(
+_logs: TTLCache[str, _LogBuffer] = TTLCache(
     maxsize=_MAX_ACTIVE_CALLS, ttl=_CALL_TTL_SECONDS
 )
 
 
+def _holds_run_slot(entry: dict, now: float) -> bool:
+    """Whether a call still counts towards the concurrent run limit."""
+    started = entry.get("started_monotonic")
+    return (
+        entry["status"] == "running"
+        and started is not None
+        and now - started < _RUN_SLOT_SECONDS
+    )
+
+
+def _call_logs(call_id: str) -> _LogBuffer:
+    """Return the log buffer for ``call_id``, creating it if needed.
+
+    Caller must hold ``_cache_lock``.
+    """
+    buffer = _logs.get(call_id)
+    if buffer is None:
+        buffer = _logs[call_id] = _LogBuffer()
+    return buffer
+
+
+# Local (non-Modal) runs get their own pool so a burst of agent runs cannot
+# starve the default executor that sync route handlers share.
+_agent_executor = ThreadPoolExecutor(
+    max_workers=settings.agent_max_concurrency, thread_name_prefix="agent"
+)
+
+
+# Long polling: ``/agent/logs`` and ``/agent/status`` accept ``wait`` and
+# hold the request until the call has something new to report, instead of
+# clients re-polling on a timer. A waiting handler parks a future in its
+# call's ``"waiters"`` list; anything that appends logs or finishes the call
+# wakes them. Wakers can run on the executor thread (``_run_local_agent``),
+# so futures are resolved through their own loop's ``call_soon_threadsafe``.
+MAX_WAIT_SECONDS = 30
+
+
+def _resolve_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _wake_waiters(call_id: str) -> None:
+    """Wake handlers waiting on ``call_id``. Caller must hold ``_cache_lock``."""
+    entry = _calls.get(call_id)
+    if entry is None:
+        return
+    for waiter in entry.pop("waiters", ()):
+        waiter.get_loop().call_soon_threadsafe(_resolve_waiter, waiter)
+
+
+async def _wait_for_update(
+    call_id: str, wait: float, is_ready: Callable[[dict], bool]
+) -> None:
+    """Wait up to ``wait`` seconds until ``is_ready(entry)`` holds.
+
+    ``is_ready`` is called with ``_cache_lock`` held. Returns straight away
+    for unknown calls, so the caller can answer with its usual 404.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        waiter = loop.create_future()
+        with _cache_lock:
+            entry = _calls.get(call_id)
+            remaining = deadline - loop.time()
+            if entry is None or is_ready(entry) or remaining <= 0:
+                return
+            entry.setdefault("waiters", []).append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=remaining)
+        except asyncio.TimeoutError:
+            with _cache_lock:
+                waiters = entry.get("waiters", [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+            return
+
+
+# Polling is chatty, so poll handlers only log for a deterministic sample of
+# calls (one in ``agent_trace_sample_rate_denom``) and, within a sampled
+# call, only its first ``MAX_LOGGED_POLLS`` requests.
+MAX_LOGGED_POLLS = 5
+
+
+def _should_log_poll(call_id: str) -> bool:
+    if zlib.crc32(call_id.encode()) % settings.agent_trace_sample_rate_denom:
+        return False
+    with _cache_lock:
+        entry = _calls.get(call_id)
+        if entry is None:
+            return True
+        logged = entry.get("logged_polls", 0)
+        if logged >= MAX_LOGGED_POLLS:
+            return False
+        entry["logged_polls"] = logged + 1
+    return True
+
+
 def _run_local_agent(
     call_id: str,
     question: str,
@@ -127,12 +314,26 @@ def _run_local_agent(
             if entry is not None:
                 entry["status"] = result.get("status", "completed")
                 entry["result"] = result
+                _wake_waiters(call_id)
     except Exception as e:
         with _cache_lock:
             entry = _calls.get(call_id)
             if entry is not None:
                 entry["status"] = "failed"
                 entry["result"] = {"status": "failed", "error": str(e)}
+                _wake_waiters(call_id)
+
+
+@functools.lru_cache(maxsize=1)
+def _modal_run_agent():
+    """Return the deployed ``run_agent`` Modal function.
+
+    Looked up once per process so the handle, once hydrated by the first
+    ``spawn``, is reused by every later request.
+    """
+    import modal
+
+    return modal.Function.from_name("policyengine-sandbox", "run_agent")
 
 
 @router.post("/run", response_model=RunResponse)
@@ -162,59 +363,74 @@ async def run_agent(request: RunRequest) -> RunResponse:
     # downstream ``/agent/log/{id}`` and ``/agent/complete/{id}`` callbacks.
     call_id = issue_signed_call_id()
 
-    # Initialize logs storage under the shared lock (background worker may
-    # append concurrently as soon as the executor task starts).
+    traceparent = get_traceparent() if settings.agent_use_modal else None
+
+    # Admission check and registration happen under one lock hold so
+    # concurrent requests cannot both take the last slot. The call is
+    # registered before it starts: its first log and completion callbacks
+    # may arrive before ``spawn`` returns and must find the entry.
     with _cache_lock:
-        _logs[call_id] = []
+        now = time.monotonic()
+        running = sum(1 for entry in _calls.values() if _holds_run_slot(entry, now))
+        if running >= settings.agent_max_concurrent_runs:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many agent runs in progress, try again later",
+            )
+        _logs[call_id] = _LogBuffer()
+        _calls[call_id] = {
+            "call": None,
+            "modal_call_id": None,
+            "question": request.question,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "started_monotonic": now,
+            "status": "running",
+            "result": None,
+            "trace_id": traceparent,  # Store for linking
+        }
 
     if settings.agent_use_modal:
         # Production: use Modal
-        import modal
-
-        traceparent = get_traceparent()
-        run_fn = modal.Function.from_name("policyengine-sandbox", "run_agent")
+        run_fn = _modal_run_agent()
         history_dicts = [
             {"role": m.role, "content": m.content} for m in request.history
         ]
-        call = run_fn.spawn(
-            request.question,
-            api_base_url,
-            call_id,
-            history_dicts,
-            traceparent=traceparent,
-        )
+        # Only sampled traces are continued in the sandbox.
+        trace_kwargs = {"traceparent": traceparent} if traceparent else {}
+        # ``spawn`` is a blocking Modal RPC; keep it off the event loop.
+        try:
+            call = await asyncio.to_thread(
+                run_fn.spawn,
+                request.question,
+                api_base_url,
+                call_id,
+                history_dicts,
+                **trace_kwargs,
+            )
+        except Exception as e:
+            # Free the run slot rather than holding it until the TTL expires.
+            with _cache_lock:
+                entry = _calls.get(call_id)
+                if entry is not None:
+                    entry["status"] = "failed"
+                    entry["result"] = {"status": "failed", "error": str(e)}
+            raise
 
         with _cache_lock:
-            _calls[call_id] = {
-                "call": call,
-                "modal_call_id": call.object_id,
-                "question": request.question,
-                "started_at": datetime.now(timezone.utc).isoformat(),
-                "status": "running",
-                "result": None,
-                "trace_id": traceparent,  # Store for linking
-            }
+            entry = _calls.get(call_id)
+            if entry is not None:
+                entry["call"] = call
+                entry["modal_call_id"] = call.object_id
         logfire.info("agent_spawned", call_id=call_id, modal_call_id=call.object_id)
     else:
         # Local development: run in background thread
-        with _cache_lock:
-            _calls[call_id] = {
-                "call": None,
-                "modal_call_id": None,
-                "question": request.question,
-                "started_at": datetime.now(timezone.utc).isoformat(),
-                "status": "running",
-                "result": None,
-            }
         logfire.info("agent_spawned_local", call_id=call_id)
 
-        # Run in background using the currently-running event loop. The
-        # endpoint is already ``async def`` so a loop is always available;
-        # ``get_event_loop`` is deprecated outside of a running loop and was
-        # emitting DeprecationWarnings on every invocation.
+        # Run in background on the agent pool. The endpoint is already
+        # ``async def`` so a running loop is always available.
         loop = asyncio.get_running_loop()
         loop.run_in_executor(
-            None,
+            _agent_executor,
             _run_local_agent,
             call_id,
             request.question,
@@ -235,14 +451,33 @@ async def post_log(
     This endpoint is called by the Modal function to stream logs back.
     The ``call_id`` must be a signed identifier issued by ``/agent/run``.
     """
-    entry = LogEntry(
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        message=log_input.message,
-    )
+    entry = _LogRecord(time.time_ns(), log_input.message)
     with _cache_lock:
-        # ``setdefault`` avoids a lost-update race with /agent/run initialising
-        # the list concurrently.
-        _logs.setdefault(call_id, []).append(entry)
+        # Get-or-create avoids a lost-update race with /agent/run
+        # initialising the buffer concurrently.
+        _call_logs(call_id).append(entry)
+        _wake_waiters(call_id)
+
+    return {"status": "ok"}
+
+
+@router.post("/log_batch/{call_id}")
+async def post_log_batch(
+    batch: LogBatchInput,
+    call_id: str = Depends(verified_call_id),
+) -> dict:
+    """Receive several log entries from the running agent at once.
+
+    The agent sends its log lines in batches through this endpoint; all
+    lines in a batch share the time they were received. ``/agent/log`` is
+    kept for single lines. The ``call_id`` must be a signed identifier
+    issued by ``/agent/run``.
+    """
+    now = time.time_ns()
+    records = [_LogRecord(now, message) for message in batch.messages]
+    with _cache_lock:
+        _call_logs(call_id).extend(records)
+        _wake_waiters(call_id)
 
     return {"status": "ok"}
 
@@ -262,22 +497,48 @@ async def complete_call(
         if entry is not None:
             entry["status"] = result.get("status", "completed")
             entry["result"] = result
+            _wake_waiters(call_id)
 
     return {"status": "ok"}
 
 
-@router.get("/logs/{call_id}", response_model=LogsResponse)
-async def get_logs(call_id: str) -> LogsResponse:
+# The poll endpoints build their trusted payloads by hand and skip response
+# model validation; ``responses`` keeps the documented schema.
+@router.get(
+    "/logs/{call_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": LogsResponse}},
+)
+async def get_logs(
+    call_id: str,
+    since_seq: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+) -> ORJSONResponse:
     """Get logs for an agent run.
 
-    Returns all logs emitted so far, plus status and result if completed.
+    Returns logs emitted so far, plus status and result if completed. Pass
+    the previous response's ``next_seq`` as ``since_seq`` to receive only
+    newer logs, and ``limit`` to receive only the most recent ones. With
+    ``wait``, a running call with no newer logs holds the request for up to
+    that many seconds until new logs arrive or the run finishes.
 
     Example:
     ```bash
-    curl https://v2.api.policyengine.org/agent/logs/fc-abc123
+    curl "https://v2.api.policyengine.org/agent/logs/fc-abc123?since_seq=12&wait=20"
     ```
     """
-    logfire.info("agent_get_logs", call_id=call_id)
+    if _should_log_poll(call_id):
+        logfire.info("agent_get_logs", call_id=call_id)
+
+    if wait:
+        await _wait_for_update(
+            call_id,
+            wait,
+            lambda entry: (
+                entry["status"] != "running" or _call_logs(call_id).next_seq > since_seq
+            ),
+        )
 
     with _cache_lock:
         call_info = _calls.get(call_id)
@@ -287,23 +548,45 @@ async def get_logs(call_id: str) -> LogsResponse:
         # mutation of the underlying dict cannot produce a half-updated response.
         status = call_info["status"]
         result = call_info["result"]
-        logs = list(_logs.get(call_id, []))
-
-    return LogsResponse(
-        call_id=call_id,
-        status=status,
-        logs=logs,
-        result=result,
+        buffer = _call_logs(call_id)
+        next_seq = buffer.next_seq
+        truncated = buffer.dropped > 0
+        records = buffer.since(since_seq, limit)
+
+    return ORJSONResponse(
+        {
+            "call_id": call_id,
+            "status": status,
+            "logs": [_to_log_entry(r) for r in records],
+            "result": result,
+            "next_seq": next_seq,
+            "truncated": truncated,
+        }
     )
 
 
-@router.get("/status/{call_id}", response_model=StatusResponse)
-async def get_status(call_id: str) -> StatusResponse:
+@router.get(
+    "/status/{call_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": StatusResponse}},
+)
+async def get_status(
+    call_id: str,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+) -> ORJSONResponse:
     """Get just the status of an agent run (no logs).
 
-    Faster than /logs if you just need to check if it's done.
+    Faster than /logs if you just need to check if it's done. With ``wait``,
+    a running call holds the request for up to that many seconds until the
+    run finishes.
     """
-    logfire.info("agent_get_status", call_id=call_id)
+    if _should_log_poll(call_id):
+        logfire.info("agent_get_status", call_id=call_id)
+
+    if wait:
+        await _wait_for_update(
+            call_id, wait, lambda entry: entry["status"] != "running"
+        )
 
     with _cache_lock:
         call_info = _calls.get(call_id)
@@ -312,8 +595,4 @@ async def get_status(call_id: str) -> StatusResponse:
         status = call_info["status"]
         result = call_info["result"]
 
-    return StatusResponse(
-        call_id=call_id,
-        status=status,
-        result=result,
-    )
+    return ORJSONResponse({"call_id": call_id, "status": status, "result": result})
@@ -15,21 +15,37 @@ WORKFLOW for full economic analysis:
 5. Review results: The completed response includes decile_impacts and program_statistics
 """
 
+import fcntl
+import hashlib
 import math
-from typing import Literal, Union
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, NamedTuple, Union
 from uuid import UUID, uuid5
 
+import httpx
 import logfire
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+)
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from pydantic import BaseModel, Field, model_validator
-from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, delete, select
 
 from policyengine_api.api.module_registry import (
     MODULE_REGISTRY,
     get_modules_for_country,
     validate_modules,
 )
+from policyengine_api.config import settings
 from policyengine_api.config.constants import (
     CountryId,
     country_id_from_model_name,
@@ -100,9 +116,7 @@ def get_traceparent() -> str | None:
 
 def _safe_float(value: float | None) -> float | None:
     """Convert NaN/inf to None for JSON serialization."""
-    if value is None:
-        return None
-    if math.isnan(value) or math.isinf(value):
+    if value is None or not math.isfinite(value):
         return None
     return value
 
@@ -111,6 +125,13 @@ def _safe_float(value: float | None) -> float | None:
 SIMULATION_NAMESPACE = UUID("a1b2c3d4-e5f6-7890-abcd-ef1234567890")
 REPORT_NAMESPACE = UUID("b2c3d4e5-f6a7-8901-bcde-f12345678901")
 
+# Local dataset downloads are streamed through a short-lived signed URL
+DATASET_CACHE_DIR = Path("/tmp/policyengine_dataset_cache")
+DATASET_SIGNED_URL_TTL_SECONDS = 3600
+DATASET_DOWNLOAD_CHUNK_SIZE = 1 << 20
+# A stalled transfer fails the run instead of holding the download lock forever
+DATASET_DOWNLOAD_TIMEOUT = httpx.Timeout(60, connect=10)
+
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
@@ -277,6 +298,107 @@ def _get_deterministic_report_id(
     return uuid5(REPORT_NAMESPACE, key)
 
 
+def _load_simulations(session: Session, sim_ids: list[UUID]) -> dict[UUID, Simulation]:
+    """Load simulations by ID with a single query.
+
+    The rows also land in the session's identity map, so a later
+    ``session.get`` for any of these IDs is answered without a query.
+    """
+    simulations = session.exec(
+        select(Simulation).where(Simulation.id.in_(set(sim_ids)))
+    ).all()
+    return {simulation.id: simulation for simulation in simulations}
+
+
+def _report_simulation_ids(report: Report) -> list[UUID]:
+    """Return a report's baseline and reform simulation IDs."""
+    if not report.baseline_simulation_id or not report.reform_simulation_id:
+        raise HTTPException(status_code=500, detail="Report missing simulation IDs")
+    return [report.baseline_simulation_id, report.reform_simulation_id]
+
+
+def _load_report_simulations(
+    report: Report, session: Session
+) -> tuple[Simulation, Simulation]:
+    """Load a report's baseline and reform simulations in one query."""
+    baseline_id, reform_id = _report_simulation_ids(report)
+    simulations = _load_simulations(session, [baseline_id, reform_id])
+    baseline_sim = simulations.get(baseline_id)
+    reform_sim = simulations.get(reform_id)
+    if not baseline_sim or not reform_sim:
+        raise HTTPException(status_code=500, detail="Simulation data missing")
+    return baseline_sim, reform_sim
+
+
+class _SimulationStatusRow(NamedTuple):
+    """The simulation columns a status poll reads, detached from the session."""
+
+    id: UUID
+    status: SimulationStatus
+    error_message: str | None
+    completed_at: datetime | None
+    region_id: UUID | None
+
+
+def _load_report_simulation_statuses(
+    report: Report, session: Session
+) -> tuple[_SimulationStatusRow, _SimulationStatusRow]:
+    """Load only the status columns of a report's two simulations.
+
+    Polls never touch the rest of the row, so this skips loading full ORM
+    objects; the rows are read-only and cannot lazy-load relationships.
+    """
+    baseline_id, reform_id = _report_simulation_ids(report)
+    rows = session.exec(
+        select(
+            Simulation.id,
+            Simulation.status,
+            Simulation.error_message,
+            Simulation.completed_at,
+            Simulation.region_id,
+        ).where(Simulation.id.in_({baseline_id, reform_id}))
+    ).all()
+    statuses = {row.id: _SimulationStatusRow(*row) for row in rows}
+    baseline_sim = statuses.get(baseline_id)
+    reform_sim = statuses.get(reform_id)
+    if not baseline_sim or not reform_sim:
+        raise HTTPException(status_code=500, detail="Simulation data missing")
+    return baseline_sim, reform_sim
+
+
+def _prefetch_economy_simulations(
+    session: Session,
+    model_version_id: UUID,
+    policy_ids: tuple[UUID | None, ...],
+    dynamic_id: UUID | None,
+    dataset_id: UUID,
+    filter_field: str | None,
+    filter_value: str | None,
+    filter_strategy: str | None,
+) -> None:
+    """Load the economy simulations for several policies in one query.
+
+    The rows land in the session's identity map, so the following
+    ``_get_or_create_simulation`` calls find them without a SELECT each.
+    """
+    _load_simulations(
+        session,
+        [
+            _get_deterministic_simulation_id(
+                SimulationType.ECONOMY,
+                model_version_id,
+                policy_id,
+                dynamic_id,
+                dataset_id=dataset_id,
+                filter_field=filter_field,
+                filter_value=filter_value,
+                filter_strategy=filter_strategy,
+            )
+            for policy_id in policy_ids
+        ],
+    )
+
+
 def _get_or_create_simulation(
     simulation_type: SimulationType,
     model_version_id: UUID,
@@ -323,8 +445,6 @@ def _get_or_create_simulation(
         region_id=region_id,
         year=year,
     )
-    from sqlalchemy.exc import IntegrityError
-
     session.add(simulation)
     try:
         session.commit()
@@ -334,7 +454,6 @@ def _get_or_create_simulation(
         if existing:
             return existing
         raise
-    session.refresh(simulation)
     return simulation
 
 
@@ -360,8 +479,6 @@ def _get_or_create_report(
         reform_simulation_id=reform_sim_id,
         status=ReportStatus.PENDING,
     )
-    from sqlalchemy.exc import IntegrityError
-
     session.add(report)
     try:
         session.commit()
@@ -371,14 +488,13 @@ def _get_or_create_report(
         if existing:
             return existing
         raise
-    session.refresh(report)
     return report
 
 
 def _build_response(
     report: Report,
-    baseline_sim: Simulation,
-    reform_sim: Simulation,
+    baseline_sim: Simulation | _SimulationStatusRow,
+    reform_sim: Simulation | _SimulationStatusRow,
     session: Session,
     region: Region | None = None,
 ) -> EconomicImpactResponse:
@@ -624,13 +740,11 @@ def _build_response(
                 for la in la_rows
             ]
 
-        # Fetch wealth decile impact records (UK only)
-        wealth_decile_rows = session.exec(
-            select(DecileImpact).where(
-                DecileImpact.report_id == report.id,
-                DecileImpact.income_variable == "household_wealth_decile",
-            )
-        ).all()
+        # Wealth decile impact records (UK only) are a subset of the decile
+        # rows already fetched above
+        wealth_decile_rows = [
+            d for d in deciles if d.income_variable == "household_wealth_decile"
+        ]
         if wealth_decile_rows:
             wealth_decile_records = [
                 DecileImpactRead(
@@ -654,13 +768,9 @@ def _build_response(
                 for d in wealth_decile_rows
             ]
 
-        # Fetch intra-wealth-decile records (UK only)
-        intra_wealth_rows = session.exec(
-            select(IntraDecileImpact).where(
-                IntraDecileImpact.report_id == report.id,
-                IntraDecileImpact.decile_type == "wealth",
-            )
-        ).all()
+        # Intra-wealth-decile records (UK only) are a subset of the
+        # intra-decile rows already fetched above
+        intra_wealth_rows = [r for r in intra_rows if r.decile_type == "wealth"]
         if intra_wealth_rows:
             intra_wealth_decile_records = [
                 IntraDecileImpactRead(
@@ -722,29 +832,107 @@ def _build_response(
 
 
 def _download_dataset_local(filepath: str) -> str:
-    """Download dataset from Supabase storage for local compute."""
-    from pathlib import Path
-
-    from policyengine_api.config import settings
-    from supabase import create_client
+    """Download dataset from Supabase storage for local compute.
 
-    cache_dir = Path("/tmp/policyengine_dataset_cache")
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_path = cache_dir / filepath
+    The file is streamed to a temporary sibling in chunks and renamed into
+    place, so concurrent runs never see a half-written cache entry. A lock
+    file serialises downloads of the same dataset within a container.
+    """
+    DATASET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path = DATASET_CACHE_DIR / filepath
 
     if cache_path.exists():
         return str(cache_path)
 
-    client = create_client(settings.supabase_url, settings.supabase_secret_key)
-    data = client.storage.from_("datasets").download(filepath)
+    from supabase import create_client
 
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(cache_path, "wb") as f:
-        f.write(data)
+    lock_path = cache_path.with_name(cache_path.name + ".lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Another run may have finished the download while we waited.
+        if cache_path.exists():
+            return str(cache_path)
+
+        client = create_client(settings.supabase_url, settings.supabase_secret_key)
+        signed = client.storage.from_("datasets").create_signed_url(
+            filepath, DATASET_SIGNED_URL_TTL_SECONDS
+        )
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            with (
+                httpx.stream(
+                    "GET", signed["signedURL"], timeout=DATASET_DOWNLOAD_TIMEOUT
+                ) as response,
+                open(tmp_path, "wb") as f,
+            ):
+                response.raise_for_status()
+                for chunk in response.iter_bytes(DATASET_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
     return str(cache_path)
 
 
+# Parameter lookups keyed by runtime model version identity. The versions are
+# process-global, so each warm worker builds a lookup once per version.
+_param_lookups: dict[int, tuple[object, dict]] = {}
+
+
+def _param_lookup_for(model_version) -> dict:
+    """Return a name -> parameter dict for a runtime model version."""
+    cached = _param_lookups.get(id(model_version))
+    if cached is None or cached[0] is not model_version:
+        lookup = {p.name: p for p in model_version.parameters}
+        _param_lookups[id(model_version)] = (model_version, lookup)
+        return lookup
+    return cached[1]
+
+
+def _build_pe_parameter_set(
+    session: Session, db_cls, pe_cls, record_id: UUID, param_lookup: dict
+):
+    """Build a PolicyEngine policy or dynamic from its database row.
+
+    Loads the row with its parameter values in one batched query and keeps
+    only values whose parameter exists in the runtime model. Returns None if
+    the row does not exist.
+    """
+    from policyengine.core.policy import ParameterValue as PEParameterValue
+
+    from policyengine_api.models import ParameterValue as DBParameterValue
+
+    record = session.exec(
+        select(db_cls)
+        .where(db_cls.id == record_id)
+        .options(
+            selectinload(db_cls.parameter_values).selectinload(
+                DBParameterValue.parameter
+            )
+        )
+    ).one_or_none()
+    if record is None:
+        return None
+    return pe_cls(
+        name=record.name,
+        description=record.description,
+        parameter_values=[
+            PEParameterValue(
+                parameter=param_lookup[pv.parameter.name],
+                value=pv.value_json.get("value")
+                if isinstance(pv.value_json, dict)
+                else pv.value_json,
+                start_date=pv.start_date,
+                end_date=pv.end_date,
+            )
+            for pv in record.parameter_values
+            if pv.parameter and pv.parameter.name in param_lookup
+        ],
+    )
+
+
 def _run_local_economy_comparison_uk(
     job_id: str, session: Session, modules: list[str] | None = None
 ) -> None:
@@ -754,10 +942,10 @@ def _run_local_economy_comparison_uk(
 
     from policyengine.core import Simulation as PESimulation
     from policyengine.core.dynamic import Dynamic as PEDynamic
-    from policyengine.core.policy import ParameterValue as PEParameterValue
     from policyengine.core.policy import Policy as PEPolicy
     from policyengine.tax_benefit_models.uk.datasets import PolicyEngineUKDataset
 
+    from policyengine_api.models import Dynamic as DBDynamic
     from policyengine_api.models import Policy as DBPolicy
 
     # Load report and simulations
@@ -786,64 +974,23 @@ def _run_local_economy_comparison_uk(
         baseline_sim.tax_benefit_model_version_id,
         reform_sim.tax_benefit_model_version_id,
     )
-    param_lookup = {p.name: p for p in pe_model_version.parameters}
+    param_lookup = _param_lookup_for(pe_model_version)
 
     def build_policy(policy_id):
         if not policy_id:
             return None
-        db_policy = session.get(DBPolicy, policy_id)
-        if not db_policy:
-            raise ValueError(f"Policy {policy_id} not found in database")
-        pe_param_values = []
-        for pv in db_policy.parameter_values:
-            if not pv.parameter:
-                continue
-            pe_param = param_lookup.get(pv.parameter.name)
-            if not pe_param:
-                continue
-            pe_pv = PEParameterValue(
-                parameter=pe_param,
-                value=pv.value_json.get("value")
-                if isinstance(pv.value_json, dict)
-                else pv.value_json,
-                start_date=pv.start_date,
-                end_date=pv.end_date,
-            )
-            pe_param_values.append(pe_pv)
-        return PEPolicy(
-            name=db_policy.name,
-            description=db_policy.description,
-            parameter_values=pe_param_values,
+        pe_policy = _build_pe_parameter_set(
+            session, DBPolicy, PEPolicy, policy_id, param_lookup
         )
+        if pe_policy is None:
+            raise ValueError(f"Policy {policy_id} not found in database")
+        return pe_policy
 
     def build_dynamic(dynamic_id):
         if not dynamic_id:
             return None
-        from policyengine_api.models import Dynamic as DBDynamic
-
-        db_dynamic = session.get(DBDynamic, dynamic_id)
-        if not db_dynamic:
-            return None
-        pe_param_values = []
-        for pv in db_dynamic.parameter_values:
-            if not pv.parameter:
-                continue
-            pe_param = param_lookup.get(pv.parameter.name)
-            if not pe_param:
-                continue
-            pe_pv = PEParameterValue(
-                parameter=pe_param,
-                value=pv.value_json.get("value")
-                if isinstance(pv.value_json, dict)
-                else pv.value_json,
-                start_date=pv.start_date,
-                end_date=pv.end_date,
-            )
-            pe_param_values.append(pe_pv)
-        return PEDynamic(
-            name=db_dynamic.name,
-            description=db_dynamic.description,
-            parameter_values=pe_param_values,
+        return _build_pe_parameter_set(
+            session, DBDynamic, PEDynamic, dynamic_id, param_lookup
         )
 
     baseline_policy = build_policy(baseline_sim.policy_id)
@@ -942,10 +1089,10 @@ def _run_local_economy_comparison_us(
 
     from policyengine.core import Simulation as PESimulation
     from policyengine.core.dynamic import Dynamic as PEDynamic
-    from policyengine.core.policy import ParameterValue as PEParameterValue
     from policyengine.core.policy import Policy as PEPolicy
     from policyengine.tax_benefit_models.us.datasets import PolicyEngineUSDataset
 
+    from policyengine_api.models import Dynamic as DBDynamic
     from policyengine_api.models import Policy as DBPolicy
 
     # Load report and simulations
@@ -974,64 +1121,23 @@ def _run_local_economy_comparison_us(
         baseline_sim.tax_benefit_model_version_id,
         reform_sim.tax_benefit_model_version_id,
     )
-    param_lookup = {p.name: p for p in pe_model_version.parameters}
+    param_lookup = _param_lookup_for(pe_model_version)
 
     def build_policy(policy_id):
         if not policy_id:
             return None
-        db_policy = session.get(DBPolicy, policy_id)
-        if not db_policy:
-            raise ValueError(f"Policy {policy_id} not found in database")
-        pe_param_values = []
-        for pv in db_policy.parameter_values:
-            if not pv.parameter:
-                continue
-            pe_param = param_lookup.get(pv.parameter.name)
-            if not pe_param:
-                continue
-            pe_pv = PEParameterValue(
-                parameter=pe_param,
-                value=pv.value_json.get("value")
-                if isinstance(pv.value_json, dict)
-                else pv.value_json,
-                start_date=pv.start_date,
-                end_date=pv.end_date,
-            )
-            pe_param_values.append(pe_pv)
-        return PEPolicy(
-            name=db_policy.name,
-            description=db_policy.description,
-            parameter_values=pe_param_values,
+        pe_policy = _build_pe_parameter_set(
+            session, DBPolicy, PEPolicy, policy_id, param_lookup
         )
+        if pe_policy is None:
+            raise ValueError(f"Policy {policy_id} not found in database")
+        return pe_policy
 
     def build_dynamic(dynamic_id):
         if not dynamic_id:
             return None
-        from policyengine_api.models import Dynamic as DBDynamic
-
-        db_dynamic = session.get(DBDynamic, dynamic_id)
-        if not db_dynamic:
-            return None
-        pe_param_values = []
-        for pv in db_dynamic.parameter_values:
-            if not pv.parameter:
-                continue
-            pe_param = param_lookup.get(pv.parameter.name)
-            if not pe_param:
-                continue
-            pe_pv = PEParameterValue(
-                parameter=pe_param,
-                value=pv.value_json.get("value")
-                if isinstance(pv.value_json, dict)
-                else pv.value_json,
-                start_date=pv.start_date,
-                end_date=pv.end_date,
-            )
-            pe_param_values.append(pe_pv)
-        return PEDynamic(
-            name=db_dynamic.name,
-            description=db_dynamic.description,
-            parameter_values=pe_param_values,
+        return _build_pe_parameter_set(
+            session, DBDynamic, PEDynamic, dynamic_id, param_lookup
         )
 
     baseline_policy = build_policy(baseline_sim.policy_id)
@@ -1121,25 +1227,73 @@ def _run_local_economy_comparison_us(
     session.commit()
 
 
+def _run_local_economy_comparison_bg(
+    job_id: str, country_id: str, bind, modules: list[str] | None = None
+) -> None:
+    """Run a local economy comparison as a background task.
+
+    Opens its own session on ``bind``: the request's session is closed by the
+    time background tasks run. Failures mark the report FAILED, since there is
+    no request left to surface them to. The report's simulations are failed
+    too, unless they had already completed, so a later request or rerun does
+    not treat them as still in progress.
+    """
+    run = (
+        _run_local_economy_comparison_uk
+        if country_id == "uk"
+        else _run_local_economy_comparison_us
+    )
+    with Session(bind) as session:
+        try:
+            run(job_id, session, modules=modules)
+        except Exception as e:
+            logfire.exception("Local economy comparison failed", job_id=job_id)
+            session.rollback()
+            report = session.get(Report, UUID(job_id))
+            if report:
+                report.status = ReportStatus.FAILED
+                report.error_message = str(e)
+                session.add(report)
+                sim_ids = [report.baseline_simulation_id, report.reform_simulation_id]
+                simulations = _load_simulations(
+                    session, [sim_id for sim_id in sim_ids if sim_id]
+                )
+                for simulation in simulations.values():
+                    if simulation.status != SimulationStatus.COMPLETED:
+                        simulation.status = SimulationStatus.FAILED
+                        simulation.error_message = str(e)
+                        session.add(simulation)
+                session.commit()
+
+
 def _trigger_economy_comparison(
     job_id: str,
     country_id: str,
     session: Session | None = None,
     modules: list[str] | None = None,
+    background_tasks: BackgroundTasks | None = None,
 ) -> None:
     """Trigger economy comparison analysis (local or Modal).
 
     Args:
         country_id: Country code ('us' or 'uk').
         modules: Optional list of module names to run. If None, runs all.
+        background_tasks: When given, local runs are queued behind the
+            response instead of blocking the request.
     """
-    from policyengine_api.config import settings
-
     traceparent = get_traceparent()
 
     if not settings.agent_use_modal and session is not None:
         # Run locally
-        if country_id == "uk":
+        if background_tasks is not None:
+            background_tasks.add_task(
+                _run_local_economy_comparison_bg,
+                job_id,
+                country_id,
+                session.get_bind(),
+                modules=modules,
+            )
+        elif country_id == "uk":
             _run_local_economy_comparison_uk(job_id, session, modules=modules)
         else:
             _run_local_economy_comparison_us(job_id, session, modules=modules)
@@ -1155,8 +1309,6 @@ def _trigger_economy_comparison(
         except Exception as e:
             # Mark report as FAILED so it doesn't stay PENDING forever
             if session is not None:
-                from uuid import UUID
-
                 report = session.get(Report, UUID(job_id))
                 if report:
                     report.status = ReportStatus.FAILED
@@ -1236,6 +1388,7 @@ def _resolve_dataset_and_region(
 @router.post("/economic-impact", response_model=EconomicImpactResponse)
 def economic_impact(
     request: EconomicImpactRequest,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ) -> EconomicImpactResponse:
     """Run economy-wide impact analysis comparing baseline vs reform.
@@ -1268,6 +1421,17 @@ def economic_impact(
     baseline_policy_db = _resolve_policy_input(request.baseline_policy_id)
     reform_policy_db = _resolve_policy_input(request.reform_policy_id)
 
+    _prefetch_economy_simulations(
+        session,
+        model_version.id,
+        (baseline_policy_db, reform_policy_db),
+        request.dynamic_id,
+        dataset_id=dataset.id,
+        filter_field=filter_field,
+        filter_value=filter_value,
+        filter_strategy=filter_strategy,
+    )
+
     # Get or create simulations using the resolved dataset
     baseline_sim = _get_or_create_simulation(
         simulation_type=SimulationType.ECONOMY,
@@ -1310,7 +1474,12 @@ def economic_impact(
     if report.status in (ReportStatus.PENDING, ReportStatus.EXECUTION_DEFERRED):
         if request.run:
             with logfire.span("trigger_economy_comparison", job_id=str(report.id)):
-                _trigger_economy_comparison(str(report.id), request.country_id, session)
+                _trigger_economy_comparison(
+                    str(report.id),
+                    request.country_id,
+                    session,
+                    background_tasks=background_tasks,
+                )
         elif report.status == ReportStatus.PENDING:
             report.status = ReportStatus.EXECUTION_DEFERRED
             session.add(report)
@@ -1319,24 +1488,69 @@ def economic_impact(
     return _build_response(report, baseline_sim, reform_sim, session, region)
 
 
-@router.get("/economic-impact/{report_id}", response_model=EconomicImpactResponse)
+def _report_etag(
+    report: Report,
+    baseline_sim: Simulation | _SimulationStatusRow,
+    reform_sim: Simulation | _SimulationStatusRow,
+) -> str:
+    """Build an ETag that changes whenever a status poll's response would.
+
+    Reports have no ``updated_at``, so the tag hashes the report and
+    simulation statuses plus the simulations' ``completed_at``, which a
+    rerun resets.
+    """
+    state = ":".join(
+        str(part)
+        for part in (
+            report.id,
+            report.status,
+            report.error_message,
+            baseline_sim.status,
+            baseline_sim.error_message,
+            baseline_sim.completed_at,
+            reform_sim.status,
+            reform_sim.error_message,
+            reform_sim.completed_at,
+        )
+    )
+    return f'"{hashlib.sha256(state.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check a request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+@router.get(
+    "/economic-impact/{report_id}",
+    response_model=EconomicImpactResponse,
+    responses={304: {"description": "Report unchanged since the given ETag"}},
+)
 def get_economic_impact_status(
     report_id: UUID,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ) -> EconomicImpactResponse:
-    """Get status and results of economic impact analysis."""
+    """Get status and results of economic impact analysis.
+
+    Responses carry an ETag. Send it back in ``If-None-Match`` while polling
+    to get an empty 304 until the report's state changes.
+    """
     report = session.get(Report, report_id)
     if not report:
         raise HTTPException(status_code=404, detail=f"Report {report_id} not found")
 
-    if not report.baseline_simulation_id or not report.reform_simulation_id:
-        raise HTTPException(status_code=500, detail="Report missing simulation IDs")
-
-    baseline_sim = session.get(Simulation, report.baseline_simulation_id)
-    reform_sim = session.get(Simulation, report.reform_simulation_id)
-
-    if not baseline_sim or not reform_sim:
-        raise HTTPException(status_code=500, detail="Simulation data missing")
+    if report.status == ReportStatus.EXECUTION_DEFERRED:
+        baseline_sim, reform_sim = _load_report_simulations(report, session)
+    else:
+        # Polls only need the simulations' status columns
+        baseline_sim, reform_sim = _load_report_simulation_statuses(report, session)
 
     # Auto-start deferred reports on first access
     if report.status == ReportStatus.EXECUTION_DEFERRED:
@@ -1345,9 +1559,20 @@ def get_economic_impact_status(
         session.commit()
         country_id = resolve_country_from_simulation(baseline_sim, session)
         with logfire.span("auto_trigger_economy_comparison", job_id=str(report.id)):
-            _trigger_economy_comparison(str(report.id), country_id, session)
+            _trigger_economy_comparison(
+                str(report.id),
+                country_id,
+                session,
+                background_tasks=background_tasks,
+            )
         session.refresh(report)
 
+    etag = _report_etag(report, baseline_sim, reform_sim)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
     region = (
         session.get(Region, baseline_sim.region_id) if baseline_sim.region_id else None
     )
@@ -1440,6 +1665,7 @@ def _build_filtered_response(
 @router.post("/economy-custom", response_model=EconomicImpactResponse)
 def economy_custom(
     request: EconomyCustomRequest,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ) -> EconomicImpactResponse:
     """Run economy-wide analysis with only the selected modules.
@@ -1487,6 +1713,17 @@ def economy_custom(
 
     _model, model_version = resolve_country_model(request.country_id, session)
 
+    _prefetch_economy_simulations(
+        session,
+        model_version.id,
+        (baseline_policy_db, reform_policy_db),
+        request.dynamic_id,
+        dataset_id=dataset.id,
+        filter_field=filter_field,
+        filter_value=filter_value,
+        filter_strategy=filter_strategy,
+    )
+
     baseline_sim = _get_or_create_simulation(
         simulation_type=SimulationType.ECONOMY,
         model_version_id=model_version.id,
@@ -1532,6 +1769,7 @@ def economy_custom(
                     request.country_id,
                     session,
                     modules=request.modules,
+                    background_tasks=background_tasks,
                 )
         elif report.status == ReportStatus.PENDING:
             report.status = ReportStatus.EXECUTION_DEFERRED
@@ -1561,14 +1799,7 @@ def get_economy_custom_status(
     if not report:
         raise HTTPException(status_code=404, detail=f"Report {report_id} not found")
 
-    if not report.baseline_simulation_id or not report.reform_simulation_id:
-        raise HTTPException(status_code=500, detail="Report missing simulation IDs")
-
-    baseline_sim = session.get(Simulation, report.baseline_simulation_id)
-    reform_sim = session.get(Simulation, report.reform_simulation_id)
-
-    if not baseline_sim or not reform_sim:
-        raise HTTPException(status_code=500, detail="Simulation data missing")
+    baseline_sim, reform_sim = _load_report_simulations(report, session)
 
     region = (
         session.get(Region, baseline_sim.region_id) if baseline_sim.region_id else None
@@ -1601,6 +1832,7 @@ class RerunResponse(BaseModel):
 )
 def rerun_report(
     report_id: UUID,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ) -> RerunResponse:
     """Force-rerun a report from scratch.
@@ -1613,8 +1845,6 @@ def rerun_report(
     destructive (drops result records) and must not be reachable by
     anonymous traffic.
     """
-    from sqlmodel import delete
-
     from policyengine_api.api.household_analysis import _trigger_household_impact
 
     # 1. Load report
@@ -1690,7 +1920,12 @@ def rerun_report(
 
     if is_economy:
         with logfire.span("rerun_economy_comparison", job_id=str(report.id)):
-            _trigger_economy_comparison(str(report.id), country_id, session)
+            _trigger_economy_comparison(
+                str(report.id),
+                country_id,
+                session,
+                background_tasks=background_tasks,
+            )
     elif is_household:
         with logfire.span("rerun_household_impact", job_id=str(report.id)):
             _trigger_household_impact(str(report.id), country_id, session)
@@ -10,9 +10,12 @@ from uuid import UUID
 
 import logfire
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from opentelemetry import trace
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from pydantic import Field
 from sqlmodel import Session, select
 
+from policyengine_api.config.constants import country_id_from_model_name
 from policyengine_api.models import (
     ChangeAggregate,
     ChangeAggregateCreate,
@@ -34,11 +37,6 @@ router = APIRouter(prefix="/outputs/change-aggregates", tags=["change-aggregates
 def _get_traceparent() -> str | None:
     """Get W3C traceparent from current span context."""
     try:
-        from opentelemetry import trace
-        from opentelemetry.trace.propagation.tracecontext import (
-            TraceContextTextMapPropagator,
-        )
-
         carrier: dict[str, str] = {}
         TraceContextTextMapPropagator().inject(
             carrier, trace.set_span_in_context(trace.get_current_span())
@@ -75,7 +73,6 @@ def _trigger_change_aggregate_computation(
 
     traceparent = _get_traceparent()
 
-    from policyengine_api.config.constants import country_id_from_model_name
     from policyengine_api.version_resolver import resolve_modal_function
 
     country = country_id_from_model_name(model.name)
@@ -102,29 +99,40 @@ def create_change_aggregates(
     Computation happens asynchronously on Modal. Poll GET /outputs/change-aggregates/{id}
     until status="completed" to get results.
     """
-    # Validate all simulations exist first
+    # Validate all simulations exist first, with one query for the batch
+    simulation_ids = {output.baseline_simulation_id for output in outputs} | {
+        output.reform_simulation_id for output in outputs
+    }
+    found_ids = set()
+    if simulation_ids:
+        found_ids = set(
+            session.exec(select(Simulation.id).where(Simulation.id.in_(simulation_ids)))
+        )
     for output in outputs:
-        baseline = session.get(Simulation, output.baseline_simulation_id)
-        if not baseline:
+        if output.baseline_simulation_id not in found_ids:
             raise HTTPException(
                 status_code=404,
                 detail=f"Baseline simulation {output.baseline_simulation_id} not found",
             )
-        reform = session.get(Simulation, output.reform_simulation_id)
-        if not reform:
+        if output.reform_simulation_id not in found_ids:
             raise HTTPException(
                 status_code=404,
                 detail=f"Reform simulation {output.reform_simulation_id} not found",
             )
 
-    db_outputs = []
-    for output in outputs:
-        db_output = ChangeAggregate.model_validate(output)
-        session.add(db_output)
-        db_outputs.append(db_output)
+    db_outputs = [ChangeAggregate.model_validate(output) for output in outputs]
+    output_ids = [db_output.id for db_output in db_outputs]
+    session.add_all(db_outputs)
     session.commit()
-    for db_output in db_outputs:
-        session.refresh(db_output)
+    # Reload the whole batch in one round trip instead of a refresh per row,
+    # and return the rows in request order
+    reloaded = {
+        db_output.id: db_output
+        for db_output in session.exec(
+            select(ChangeAggregate).where(ChangeAggregate.id.in_(output_ids))
+        )
+    }
+    db_outputs = [reloaded[output_id] for output_id in output_ids]
 
     # Trigger computation for each change aggregate
     for db_output in db_outputs:
@@ -14,6 +14,7 @@ from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapProp
 from pydantic import AfterValidator, BaseModel, Field
 from sqlmodel import Session
 
+from policyengine_api.config import settings
 from policyengine_api.config.constants import CountryId
 from policyengine_api.models import (
     Dynamic,
@@ -815,8 +816,6 @@ def _trigger_modal_household(
     session: Session | None = None,
 ) -> None:
     """Trigger household simulation - Modal or local based on settings."""
-    from policyengine_api.config import settings
-
     if not settings.agent_use_modal and session is not None:
         # Run locally
         if request.country_id == "uk":
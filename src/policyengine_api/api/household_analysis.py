@@ -26,6 +26,7 @@ from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapProp
 from pydantic import BaseModel, Field
 from sqlmodel import Session
 
+from policyengine_api.config import settings
 from policyengine_api.models import (
     Household,
     Policy,
@@ -473,8 +474,6 @@ def _trigger_household_impact(
     Args:
         country_id: Country code ('us' or 'uk').
     """
-    from policyengine_api.config import settings
-
     traceparent = get_traceparent()
 
     if not settings.agent_use_modal and session is not None:
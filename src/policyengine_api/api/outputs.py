@@ -9,9 +9,12 @@ from uuid import UUID
 
 import logfire
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from opentelemetry import trace
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from pydantic import Field
 from sqlmodel import Session, select
 
+from policyengine_api.config.constants import country_id_from_model_name
 from policyengine_api.models import (
     AggregateOutput,
     AggregateOutputCreate,
@@ -33,11 +36,6 @@ router = APIRouter(prefix="/outputs/aggregates", tags=["aggregates"])
 def _get_traceparent() -> str | None:
     """Get W3C traceparent from current span context."""
     try:
-        from opentelemetry import trace
-        from opentelemetry.trace.propagation.tracecontext import (
-            TraceContextTextMapPropagator,
-        )
-
         carrier: dict[str, str] = {}
         TraceContextTextMapPropagator().inject(
             carrier, trace.set_span_in_context(trace.get_current_span())
@@ -74,7 +72,6 @@ def _trigger_aggregate_computation(
 
     traceparent = _get_traceparent()
 
-    from policyengine_api.config.constants import country_id_from_model_name
     from policyengine_api.version_resolver import resolve_modal_function
 
     country = country_id_from_model_name(model.name)
@@ -101,23 +98,33 @@ def create_aggregate_outputs(
     Computation happens asynchronously on Modal. Poll GET /outputs/aggregates/{id}
     until status="completed" to get results.
     """
-    # Validate all simulations exist first
+    # Validate all simulations exist first, with one query for the batch
+    simulation_ids = {output.simulation_id for output in outputs}
+    found_ids = set()
+    if simulation_ids:
+        found_ids = set(
+            session.exec(select(Simulation.id).where(Simulation.id.in_(simulation_ids)))
+        )
     for output in outputs:
-        simulation = session.get(Simulation, output.simulation_id)
-        if not simulation:
+        if output.simulation_id not in found_ids:
             raise HTTPException(
                 status_code=404,
                 detail=f"Simulation {output.simulation_id} not found",
             )
 
-    db_outputs = []
-    for output in outputs:
-        db_output = AggregateOutput.model_validate(output)
-        session.add(db_output)
-        db_outputs.append(db_output)
+    db_outputs = [AggregateOutput.model_validate(output) for output in outputs]
+    output_ids = [db_output.id for db_output in db_outputs]
+    session.add_all(db_outputs)
     session.commit()
-    for db_output in db_outputs:
-        session.refresh(db_output)
+    # Reload the whole batch in one round trip instead of a refresh per row,
+    # and return the rows in request order
+    reloaded = {
+        db_output.id: db_output
+        for db_output in session.exec(
+            select(AggregateOutput).where(AggregateOutput.id.in_(output_ids))
+        )
+    }
+    db_outputs = [reloaded[output_id] for output_id in output_ids]
 
     # Trigger computation for each aggregate
     for db_output in db_outputs:
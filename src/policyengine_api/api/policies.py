@@ -103,35 +103,42 @@ def create_policy(policy: PolicyCreate, session: Session = Depends(get_session))
     if not tax_model:
         raise HTTPException(status_code=404, detail="Tax benefit model not found")
 
-    # Create the policy
+    # Validate all parameters exist with one query rather than one per value
+    parameter_ids = {pv_data.parameter_id for pv_data in policy.parameter_values}
+    found_ids = set()
+    if parameter_ids:
+        found_ids = set(
+            session.exec(select(Parameter.id).where(Parameter.id.in_(parameter_ids)))
+        )
+    for pv_data in policy.parameter_values:
+        if pv_data.parameter_id not in found_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Parameter {pv_data.parameter_id} not found",
+            )
+
+    # Create the policy (its ID is assigned client-side, so no flush is
+    # needed before linking the parameter values)
     db_policy = Policy(
         name=policy.name,
         description=policy.description,
         tax_benefit_model_id=policy.tax_benefit_model_id,
     )
     session.add(db_policy)
-    session.flush()  # Get the policy ID before adding parameter values
 
-    # Create associated parameter values
-    for pv_data in policy.parameter_values:
-        # Validate parameter exists
-        param = session.get(Parameter, pv_data.parameter_id)
-        if not param:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Parameter {pv_data.parameter_id} not found",
+    # Create associated parameter values (dates already parsed by Pydantic)
+    session.add_all(
+        [
+            ParameterValue(
+                parameter_id=pv_data.parameter_id,
+                value_json=pv_data.value_json,
+                start_date=pv_data.start_date,
+                end_date=pv_data.end_date,
+                policy_id=db_policy.id,
             )
-
-        # Create parameter value (dates already parsed by Pydantic)
-        db_pv = ParameterValue(
-            parameter_id=pv_data.parameter_id,
-            value_json=pv_data.value_json,
-            start_date=pv_data.start_date,
-            end_date=pv_data.end_date,
-            policy_id=db_policy.id,
-        )
-        session.add(db_pv)
-
+            for pv_data in policy.parameter_values
+        ]
+    )
     session.commit()
 
     # Re-fetch with eager loading for the response
@@ -1,5 +1,6 @@
 from importlib.metadata import version
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -49,6 +50,14 @@ class Settings(BaseSettings):
     # HMAC secret used to sign agent callback identifiers. If unset the
     # security module falls back to a per-process random value.
     agent_callback_secret: str = ""
+    # Worker threads for local (non-Modal) agent runs.
+    agent_max_concurrency: int = Field(8, ge=1)
+    # Agent runs allowed in progress at once; /agent/run answers 429 beyond.
+    agent_max_concurrent_runs: int = Field(32, ge=1)
+    # Log poll requests for one in this many agent calls (1 = every call).
+    agent_trace_sample_rate_denom: int = Field(1, ge=1)
+    # Most recent log lines kept per agent call; older lines are dropped.
+    agent_max_logs_per_call: int = Field(2000, ge=1)
 
     # Shared API key used to gate destructive/privileged endpoints.
     api_key: str = ""
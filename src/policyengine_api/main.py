@@ -4,6 +4,7 @@ from pathlib import Path
 import logfire
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
@@ -87,6 +88,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (e.g. the OpenAPI spec the agent downloads on
+# cold start). Server-sent event streams such as /mcp are left uncompressed.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Instrument FastAPI with Logfire (only if configured)
 if _logfire_enabled:
     logfire.instrument_fastapi(app, excluded_urls=["/health"])
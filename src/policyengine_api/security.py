@@ -21,7 +21,6 @@ from __future__ import annotations
 import hashlib
 import hmac
 import secrets
-import uuid
 
 from fastapi import Header, HTTPException, Path
 
@@ -59,7 +58,7 @@ def issue_signed_call_id(prefix: str = "fc-") -> str:
     The random portion is 24 hex characters (96 bits) — enough entropy that
     even without the signature, brute-force lookups are infeasible.
     """
-    raw = f"{prefix}{uuid.uuid4().hex[:24]}"
+    raw = f"{prefix}{secrets.token_hex(12)}"
     return f"{raw}{_SEPARATOR}{_compute_tag(raw)}"
 
 
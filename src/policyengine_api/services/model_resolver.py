@@ -37,6 +37,21 @@ def resolve_country_model(
     """
     model_name = resolve_model_name(country_id)
 
+    # One round trip for the common case: the model joined to its newest
+    # version. The error paths below re-query only to pick the right 404.
+    row = session.exec(
+        select(TaxBenefitModel, TaxBenefitModelVersion)
+        .join(
+            TaxBenefitModelVersion,
+            TaxBenefitModelVersion.model_id == TaxBenefitModel.id,
+        )
+        .where(TaxBenefitModel.name == model_name)
+        .order_by(TaxBenefitModelVersion.created_at.desc())
+        .limit(1)
+    ).first()
+    if row is not None:
+        return row[0], row[1]
+
     model = session.exec(
         select(TaxBenefitModel).where(TaxBenefitModel.name == model_name)
     ).first()
@@ -44,19 +59,10 @@ def resolve_country_model(
         raise HTTPException(
             status_code=404, detail=f"Model not found for country: {country_id}"
         )
-
-    version = session.exec(
-        select(TaxBenefitModelVersion)
-        .where(TaxBenefitModelVersion.model_id == model.id)
-        .order_by(TaxBenefitModelVersion.created_at.desc())
-    ).first()
-    if not version:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No version found for model: {model_name}",
-        )
-
-    return model, version
+    raise HTTPException(
+        status_code=404,
+        detail=f"No version found for model: {model_name}",
+    )
 
 
 def resolve_version_id(
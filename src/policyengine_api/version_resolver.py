@@ -53,6 +53,22 @@ def _resolve_app_name(country: str, version: str | None, environment: str) -> st
     return version_dict[resolved_version]
 
 
+@functools.lru_cache(maxsize=64)
+def _function_ref(
+    app_name: str, function_name: str, environment: str
+) -> modal.Function:
+    """Return a Modal function handle, built once per app and function.
+
+    Reusing the handle means it is hydrated by its first ``spawn`` and
+    every later call skips the lookup round trip.
+    """
+    return modal.Function.from_name(
+        app_name,
+        function_name,
+        environment_name=environment,
+    )
+
+
 def resolve_modal_function(
     function_name: str,
     country: str,
@@ -72,8 +88,4 @@ def resolve_modal_function(
     from policyengine_api.config import settings
 
     app_name = _resolve_app_name(country, version, settings.modal_environment)
-    return modal.Function.from_name(
-        app_name,
-        function_name,
-        environment_name=settings.modal_environment,
-    )
+    return _function_ref(app_name, function_name, settings.modal_environment)
@@ -0,0 +1,311 @@
+"""Unit tests for the agent router: run lookup, logs and status polling."""
+
+import asyncio
+import threading
+import time
+import zlib
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from policyengine_api import security
+from policyengine_api.api import agent as agent_router
+from policyengine_api.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def call_id():
+    signed = security.issue_signed_call_id()
+    with agent_router._cache_lock:
+        agent_router._calls[signed] = {
+            "status": "running",
+            "result": None,
+            "started_monotonic": time.monotonic(),
+        }
+        agent_router._logs[signed] = agent_router._LogBuffer()
+    yield signed
+    with agent_router._cache_lock:
+        agent_router._calls.pop(signed, None)
+        agent_router._logs.pop(signed, None)
+
+
+def test_logs_are_returned_with_iso_timestamps(call_id):
+    client.post(f"/agent/log/{call_id}", json={"message": "first"})
+    client.post(f"/agent/log/{call_id}", json={"message": "second"})
+
+    resp = client.get(f"/agent/logs/{call_id}")
+
+    assert resp.status_code == 200
+    logs = resp.json()["logs"]
+    assert [entry["message"] for entry in logs] == ["first", "second"]
+    stamps = [datetime.fromisoformat(entry["timestamp"]) for entry in logs]
+    assert all(stamp.tzinfo is not None for stamp in stamps)
+    assert stamps[0] <= stamps[1]
+
+
+def test_log_batch_appends_all_lines_in_order(call_id):
+    resp = client.post(
+        f"/agent/log_batch/{call_id}", json={"messages": ["one", "two", "three"]}
+    )
+
+    assert resp.status_code == 200
+    logs = client.get(f"/agent/logs/{call_id}").json()["logs"]
+    assert [entry["message"] for entry in logs] == ["one", "two", "three"]
+
+
+def test_log_batch_rejects_oversize_batch(call_id):
+    messages = ["x"] * (agent_router.MAX_LOG_BATCH_SIZE + 1)
+    resp = client.post(f"/agent/log_batch/{call_id}", json={"messages": messages})
+    assert resp.status_code == 422
+
+
+def test_log_batch_rejects_unsigned_call_id():
+    resp = client.post("/agent/log_batch/fc-not-signed", json={"messages": ["x"]})
+    assert resp.status_code == 401
+
+
+def test_since_seq_returns_only_newer_logs(call_id):
+    client.post(f"/agent/log_batch/{call_id}", json={"messages": ["a", "b"]})
+    first = client.get(f"/agent/logs/{call_id}").json()
+    client.post(f"/agent/log/{call_id}", json={"message": "c"})
+
+    second = client.get(
+        f"/agent/logs/{call_id}", params={"since_seq": first["next_seq"]}
+    ).json()
+
+    assert first["next_seq"] == 2
+    assert [entry["message"] for entry in second["logs"]] == ["c"]
+    assert second["next_seq"] == 3
+
+
+def _post_later(url: str, payload: dict) -> threading.Thread:
+    def post():
+        time.sleep(0.2)
+        TestClient(app).post(url, json=payload)
+
+    thread = threading.Thread(target=post)
+    thread.start()
+    return thread
+
+
+def test_status_wait_returns_when_call_completes(call_id):
+    thread = _post_later(f"/agent/complete/{call_id}", {"status": "completed"})
+
+    start = time.monotonic()
+    resp = client.get(f"/agent/status/{call_id}", params={"wait": 10})
+    thread.join()
+
+    assert resp.json()["status"] == "completed"
+    assert time.monotonic() - start < 5
+
+
+def test_logs_wait_returns_when_new_logs_arrive(call_id):
+    thread = _post_later(f"/agent/log/{call_id}", {"message": "late"})
+
+    resp = client.get(f"/agent/logs/{call_id}", params={"wait": 10})
+    thread.join()
+
+    assert [entry["message"] for entry in resp.json()["logs"]] == ["late"]
+
+
+def test_wait_times_out_while_running(call_id):
+    resp = client.get(f"/agent/status/{call_id}", params={"wait": 0.2})
+
+    assert resp.json()["status"] == "running"
+    with agent_router._cache_lock:
+        assert not agent_router._calls[call_id].get("waiters")
+
+
+def test_modal_function_is_looked_up_once():
+    agent_router._modal_run_agent.cache_clear()
+    try:
+        with patch("modal.Function.from_name") as mock_from_name:
+            first = agent_router._modal_run_agent()
+            second = agent_router._modal_run_agent()
+    finally:
+        agent_router._modal_run_agent.cache_clear()
+
+    assert first is second
+    mock_from_name.assert_called_once_with("policyengine-sandbox", "run_agent")
+
+
+def test_modal_spawn_runs_off_the_event_loop():
+    loops_seen = []
+    spawn_kwargs = []
+
+    def spawn(*args, **kwargs):
+        spawn_kwargs.append(kwargs)
+        try:
+            loops_seen.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops_seen.append(None)
+        return type("Call", (), {"object_id": "fc-test"})()
+
+    run_fn = type("RunFn", (), {"spawn": staticmethod(spawn)})()
+    with (
+        patch.object(agent_router.settings, "agent_use_modal", True),
+        patch.object(agent_router, "_modal_run_agent", return_value=run_fn),
+    ):
+        resp = client.post("/agent/run", json={"question": "Hi"})
+
+    call_id = resp.json()["call_id"]
+    with agent_router._cache_lock:
+        entry = agent_router._calls.pop(call_id)
+        agent_router._logs.pop(call_id, None)
+    assert entry["modal_call_id"] == "fc-test"
+    # Called from a worker thread, not on the event loop.
+    assert loops_seen == [None]
+    # No sampled trace is active, so no traceparent is sent.
+    assert spawn_kwargs == [{}]
+
+
+def test_local_runs_use_the_agent_executor():
+    ran = threading.Event()
+    thread_names = []
+
+    def fake_run(*args):
+        thread_names.append(threading.current_thread().name)
+        ran.set()
+
+    with (
+        patch.object(agent_router.settings, "agent_use_modal", False),
+        patch.object(agent_router, "_run_local_agent", side_effect=fake_run),
+    ):
+        resp = client.post("/agent/run", json={"question": "Hi"})
+        assert ran.wait(5)
+
+    call_id = resp.json()["call_id"]
+    with agent_router._cache_lock:
+        agent_router._calls.pop(call_id, None)
+        agent_router._logs.pop(call_id, None)
+    assert thread_names[0].startswith("agent")
+
+
+def test_poll_logging_is_capped_per_call(call_id):
+    with patch.object(agent_router.logfire, "info") as mock_info:
+        for _ in range(agent_router.MAX_LOGGED_POLLS + 3):
+            client.get(f"/agent/status/{call_id}")
+
+    assert mock_info.call_count == agent_router.MAX_LOGGED_POLLS
+
+
+def test_poll_logging_skips_unsampled_calls(call_id, monkeypatch):
+    monkeypatch.setattr(agent_router.settings, "agent_trace_sample_rate_denom", 2)
+    sampled = zlib.crc32(call_id.encode()) % 2 == 0
+
+    with patch.object(agent_router.logfire, "info") as mock_info:
+        client.get(f"/agent/logs/{call_id}")
+
+    assert mock_info.called is sampled
+
+
+def _span(trace_flags):
+    return trace.NonRecordingSpan(
+        trace.SpanContext(
+            trace_id=0x1234,
+            span_id=0x5678,
+            is_remote=False,
+            trace_flags=trace.TraceFlags(trace_flags),
+        )
+    )
+
+
+def test_traceparent_matches_w3c_format():
+    with trace.use_span(_span(trace.TraceFlags.SAMPLED)):
+        traceparent = agent_router.get_traceparent()
+
+    carrier = {}
+    with trace.use_span(_span(trace.TraceFlags.SAMPLED)):
+        TraceContextTextMapPropagator().inject(carrier)
+    assert traceparent == carrier["traceparent"]
+
+
+def test_traceparent_is_omitted_for_unsampled_spans():
+    with trace.use_span(_span(trace.TraceFlags.DEFAULT)):
+        assert agent_router.get_traceparent() is None
+    assert agent_router.get_traceparent() is None
+
+
+def test_logs_keep_only_the_most_recent_lines(call_id, monkeypatch):
+    monkeypatch.setattr(agent_router.settings, "agent_max_logs_per_call", 3)
+    with agent_router._cache_lock:
+        agent_router._logs[call_id] = agent_router._LogBuffer()
+    client.post(f"/agent/log_batch/{call_id}", json={"messages": list("abcde")})
+
+    full = client.get(f"/agent/logs/{call_id}").json()
+    tail = client.get(f"/agent/logs/{call_id}", params={"since_seq": 4}).json()
+
+    assert [entry["message"] for entry in full["logs"]] == ["c", "d", "e"]
+    assert full["truncated"] is True
+    assert full["next_seq"] == 5
+    assert [entry["message"] for entry in tail["logs"]] == ["e"]
+
+
+def test_limit_returns_only_the_tail(call_id):
+    client.post(f"/agent/log_batch/{call_id}", json={"messages": list("abcd")})
+
+    resp = client.get(f"/agent/logs/{call_id}", params={"limit": 2}).json()
+
+    assert [entry["message"] for entry in resp["logs"]] == ["c", "d"]
+    assert resp["next_seq"] == 4
+
+
+def test_poll_endpoints_keep_their_documented_schemas():
+    paths = app.openapi()["paths"]
+
+    for path, model in [
+        ("/agent/logs/{call_id}", "LogsResponse"),
+        ("/agent/status/{call_id}", "StatusResponse"),
+    ]:
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]
+        assert schema["schema"]["$ref"].endswith(f"/{model}")
+
+
+def test_run_is_rejected_when_too_many_are_in_progress(call_id, monkeypatch):
+    with agent_router._cache_lock:
+        now = time.monotonic()
+        running = sum(
+            1
+            for entry in agent_router._calls.values()
+            if agent_router._holds_run_slot(entry, now)
+        )
+    monkeypatch.setattr(agent_router.settings, "agent_max_concurrent_runs", running)
+
+    with patch.object(agent_router, "_run_local_agent") as mock_run:
+        resp = client.post("/agent/run", json={"question": "Hi"})
+
+    assert resp.status_code == 429
+    mock_run.assert_not_called()
+
+
+def test_stale_running_call_does_not_hold_a_run_slot(call_id, monkeypatch):
+    """A run that died without calling /agent/complete stops blocking others."""
+    with agent_router._cache_lock:
+        now = time.monotonic()
+        running = sum(
+            1
+            for entry in agent_router._calls.values()
+            if agent_router._holds_run_slot(entry, now)
+        )
+        agent_router._calls[call_id]["started_monotonic"] = (
+            now - agent_router._RUN_SLOT_SECONDS - 1
+        )
+    monkeypatch.setattr(agent_router.settings, "agent_max_concurrent_runs", running)
+
+    with patch.object(agent_router, "_run_local_agent"):
+        resp = client.post("/agent/run", json={"question": "Hi"})
+
+    assert resp.status_code == 200
+
+
+def test_run_slot_outlasts_the_sandbox_timeout():
+    """Live runs keep their slot until Modal's own timeout has passed."""
+    from policyengine_api.agent_sandbox import AGENT_RUN_TIMEOUT_SECONDS
+
+    assert agent_router._RUN_SLOT_SECONDS > AGENT_RUN_TIMEOUT_SECONDS
@@ -0,0 +1,39 @@
+"""Tests for running several agent inputs concurrently in one Modal container."""
+
+from unittest.mock import patch
+
+from opentelemetry import context, trace
+
+from policyengine_api import agent_sandbox
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+def test_logfire_is_configured_once_per_process(monkeypatch):
+    monkeypatch.setenv("LOGFIRE_TOKEN", "test-token")
+
+    with (
+        patch.object(agent_sandbox, "_logfire_configured", False),
+        patch("logfire.configure") as mock_configure,
+    ):
+        agent_sandbox.configure_logfire()
+        agent_sandbox.configure_logfire()
+
+    mock_configure.assert_called_once()
+
+
+def test_attached_trace_context_can_be_detached(monkeypatch):
+    """Each input detaches its traceparent so reused threads start clean."""
+    monkeypatch.setenv("LOGFIRE_TOKEN", "test-token")
+
+    with (
+        patch.object(agent_sandbox, "_logfire_configured", True),
+        patch("logfire.configure"),
+    ):
+        token = agent_sandbox.configure_logfire(TRACEPARENT)
+
+    span_context = trace.get_current_span().get_span_context()
+    assert f"{span_context.trace_id:032x}" == TRACEPARENT.split("-")[1]
+
+    context.detach(token)
+    assert not trace.get_current_span().get_span_context().is_valid
@@ -0,0 +1,104 @@
+"""Tests for bounding the message history re-sent on each agent turn."""
+
+import orjson
+
+from policyengine_api.agent_sandbox import (
+    _ELIDED_TURNS_MESSAGE,
+    AGENT_HISTORY_MAX_MESSAGES,
+    AGENT_HISTORY_TOKEN_BUDGET,
+    _bounded_history,
+    _trim_agent_turns,
+)
+
+
+def _exchange(i: int) -> list[dict]:
+    return [
+        {"role": "assistant", "content": f"call {i}"},
+        {"role": "user", "content": f"result {i}"},
+    ]
+
+
+def test_short_runs_are_untouched():
+    messages = [{"role": "user", "content": "q"}, *_exchange(1), *_exchange(2)]
+    before = list(messages)
+
+    _trim_agent_turns(messages, head=1, keep_turns=2)
+
+    assert messages == before
+
+
+def test_old_exchanges_are_replaced_by_placeholder():
+    head = [
+        {"role": "user", "content": "earlier question"},
+        {"role": "assistant", "content": "earlier answer"},
+        {"role": "user", "content": "q"},
+    ]
+    messages = list(head)
+    for i in range(5):
+        messages.extend(_exchange(i))
+        _trim_agent_turns(messages, head=len(head), keep_turns=2)
+
+    assert messages == [
+        *head,
+        _ELIDED_TURNS_MESSAGE,
+        *_exchange(3),
+        *_exchange(4),
+    ]
+
+
+def test_kept_tail_starts_with_assistant_turn():
+    """Tool results must never be separated from their tool_use turn."""
+    messages = [{"role": "user", "content": "q"}]
+    for i in range(10):
+        messages.extend(_exchange(i))
+        _trim_agent_turns(messages, head=1, keep_turns=3)
+        tail = messages[2:] if messages[1] is _ELIDED_TURNS_MESSAGE else messages[1:]
+        assert tail[0]["role"] == "assistant"
+        assert len(tail) <= 12
+
+
+def test_prefix_is_stable_across_turns_between_trims():
+    """Consecutive trimmed turns re-send a byte-identical prefix.
+
+    The conversation cache breakpoint sits on the newest tool result, so a
+    turn can only read the cache if everything before the previous turn's
+    breakpoint is unchanged.
+    """
+    keep_turns = 3
+    messages = [{"role": "user", "content": "q"}]
+    sent = []
+    for i in range(20):
+        messages.extend(_exchange(i))
+        _trim_agent_turns(messages, head=1, keep_turns=keep_turns)
+        sent.append(orjson.dumps(messages))
+
+    trims = [i for i in range(1, len(sent)) if not sent[i].startswith(sent[i - 1][:-1])]
+    # A trim happens at most once every keep_turns turns; every other turn
+    # extends the previous request unchanged.
+    assert trims
+    assert all(b - a >= keep_turns for a, b in zip(trims, trims[1:]))
+
+
+def test_history_keeps_most_recent_messages():
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"}
+        for i in range(AGENT_HISTORY_MAX_MESSAGES + 4)
+    ]
+
+    bounded = _bounded_history(history)
+
+    assert bounded == history[-AGENT_HISTORY_MAX_MESSAGES:]
+
+
+def test_history_drops_oldest_messages_over_token_budget():
+    big = "x" * (AGENT_HISTORY_TOKEN_BUDGET * 4)
+    history = [
+        {"role": "user", "content": big},
+        {"role": "assistant", "content": "answer"},
+        {"role": "user", "content": "follow-up"},
+        {"role": "assistant", "content": "answer 2"},
+    ]
+
+    # The oversized message goes, and so does the assistant reply that would
+    # otherwise open the conversation.
+    assert _bounded_history(history) == history[2:]
@@ -0,0 +1,116 @@
+"""Tests for delivering agent log lines off the agent thread."""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from policyengine_api import agent_sandbox
+
+
+class _FakeStream:
+    def __init__(self, message):
+        self._message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def get_final_message(self):
+        return self._message
+
+
+def test_log_lines_are_delivered_before_completion():
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.return_value = _FakeStream(
+        SimpleNamespace(
+            stop_reason="end_turn",
+            content=[SimpleNamespace(type="text", text="Done.")],
+        )
+    )
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+        patch.object(agent_sandbox._session, "post") as mock_post,
+    ):
+        agent_sandbox._run_agent_impl(
+            "Hi", api_base_url="https://example.test", call_id="abc", max_turns=1
+        )
+
+    urls = [c.args[0] for c in mock_post.call_args_list]
+    assert urls[-1] == "https://example.test/agent/complete/abc"
+    assert set(urls[:-1]) == {"https://example.test/agent/log_batch/abc"}
+    messages = [
+        m for c in mock_post.call_args_list[:-1] for m in c.kwargs["json"]["messages"]
+    ]
+    assert messages[0] == "[AGENT] Starting: Hi"
+    assert messages[-1] == "[AGENT] Completed in 1 turns"
+
+
+def test_failed_run_still_reports_completion():
+    """A crash posts a failed result so the API frees the run's slot."""
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.side_effect = RuntimeError("overloaded")
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+        patch.object(agent_sandbox._session, "post") as mock_post,
+        pytest.raises(RuntimeError),
+    ):
+        agent_sandbox._run_agent_impl(
+            "Hi", api_base_url="https://example.test", call_id="abc", max_turns=1
+        )
+
+    last = mock_post.call_args_list[-1]
+    assert last.args[0] == "https://example.test/agent/complete/abc"
+    assert last.kwargs["json"] == {"status": "failed", "error": "overloaded"}
+
+
+def test_lines_queued_together_are_posted_as_one_batch():
+    with patch.object(agent_sandbox._session, "post") as mock_post:
+        for i in range(3):
+            agent_sandbox._queue_log_post("https://example.test", "x", f"line {i}", {})
+        agent_sandbox._flush_log_posts()
+
+    batches = [c.kwargs["json"]["messages"] for c in mock_post.call_args_list]
+    assert [m for b in batches for m in b] == ["line 0", "line 1", "line 2"]
+    assert len(batches) < 3
+
+
+def test_falls_back_to_single_lines_without_batch_endpoint():
+    def post(url, **kwargs):
+        return MagicMock(status_code=404 if "log_batch" in url else 200)
+
+    with patch.object(agent_sandbox._session, "post", side_effect=post) as mock_post:
+        agent_sandbox._post_log_batch(
+            [
+                ("https://example.test", "x", "a", {}),
+                ("https://example.test", "x", "b", {}),
+            ]
+        )
+
+    single = [c.kwargs["json"] for c in mock_post.call_args_list[1:]]
+    assert single == [{"message": "a"}, {"message": "b"}]
+
+
+def test_slow_log_delivery_does_not_block_the_caller():
+    release = threading.Event()
+
+    def slow_post(*args, **kwargs):
+        release.wait(5)
+
+    with patch.object(agent_sandbox._session, "post", side_effect=slow_post):
+        agent_sandbox._queue_log_post("https://example.test", "x", "hi", {})
+        # Returned while the post is still blocked on the log thread.
+        release.set()
+        agent_sandbox._flush_log_posts()
@@ -0,0 +1,113 @@
+"""Tests for running a turn's tool calls concurrently."""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from policyengine_api import agent_sandbox
+
+
+class _FakeStream:
+    def __init__(self, message, on_iter=None):
+        self._message = message
+        self._on_iter = on_iter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for block in self._message.content:
+            if self._on_iter:
+                self._on_iter(block)
+            yield SimpleNamespace(type="content_block_stop", content_block=block)
+
+    def get_final_message(self):
+        return self._message
+
+
+def _tool_use(id, name, input=None):
+    return SimpleNamespace(type="tool_use", id=id, name=name, input=input or {})
+
+
+def _run(first_turn_tools, execute, on_iter=None, sleep=None):
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.side_effect = [
+        _FakeStream(
+            SimpleNamespace(stop_reason="tool_use", content=first_turn_tools),
+            on_iter=on_iter,
+        ),
+        _FakeStream(
+            SimpleNamespace(
+                stop_reason="end_turn",
+                content=[SimpleNamespace(type="text", text="Done.")],
+            )
+        ),
+    ]
+    tools = ([], {"a": {"name": "a"}, "b": {"name": "b"}})
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "build_agent_tools", return_value=tools),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+        patch.object(agent_sandbox, "execute_api_tool", side_effect=execute),
+        patch.object(agent_sandbox.time, "sleep", side_effect=sleep),
+    ):
+        agent_sandbox._run_agent_impl("Hi", max_turns=2)
+
+    messages = client.messages.stream.call_args.kwargs["messages"]
+    return [m for m in messages if m["role"] == "user"][-1]["content"]
+
+
+def test_tool_calls_in_one_turn_run_concurrently():
+    # Each call waits for the other; run sequentially this would time out.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def execute(tool, *args, **kwargs):
+        barrier.wait()
+        return f"result {tool['name']}"
+
+    results = _run([_tool_use("1", "a"), _tool_use("2", "b")], execute)
+
+    assert [(r["tool_use_id"], r["content"]) for r in results] == [
+        ("1", "result a"),
+        ("2", "result b"),
+    ]
+
+
+def test_tool_calls_start_while_the_turn_is_streaming():
+    # The second block is only emitted once the first call has started.
+    started = threading.Event()
+
+    def execute(tool, *args, **kwargs):
+        started.set()
+        return "ok"
+
+    def on_iter(block):
+        if block.id == "2":
+            assert started.wait(timeout=5)
+
+    _run([_tool_use("1", "a"), _tool_use("2", "b")], execute, on_iter=on_iter)
+
+
+def test_turns_that_sleep_run_in_order():
+    events = []
+
+    def execute(tool, *args, **kwargs):
+        events.append(tool["name"])
+        return "ok"
+
+    _run(
+        [
+            _tool_use("1", "a"),
+            _tool_use("2", "sleep", {"seconds": 5}),
+            _tool_use("3", "b"),
+        ],
+        execute,
+        sleep=lambda seconds: events.append("sleep"),
+    )
+
+    assert events == ["a", "sleep", "b"]
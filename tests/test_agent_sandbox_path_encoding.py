@@ -2,6 +2,7 @@
 
 from unittest.mock import MagicMock, patch
 
+from policyengine_api import agent_sandbox
 from policyengine_api.agent_sandbox import execute_api_tool
 
 
@@ -9,7 +10,7 @@ def test_path_parameter_is_url_encoded():
     """Values containing '/' must not escape the intended path segment."""
     fake_resp = MagicMock()
     fake_resp.status_code = 200
-    fake_resp.json.return_value = {"ok": True}
+    fake_resp.content = b'{"ok": true}'
 
     tool = {
         "_meta": {
@@ -19,9 +20,9 @@ def test_path_parameter_is_url_encoded():
         }
     }
 
-    with patch(
-        "policyengine_api.agent_sandbox.requests.get", return_value=fake_resp
-    ) as mock_get:
+    with patch.object(
+        agent_sandbox._session, "request", return_value=fake_resp
+    ) as mock_request:
         execute_api_tool(
             tool=tool,
             tool_input={"widget_id": "abc/def#frag"},
@@ -29,6 +30,6 @@ def test_path_parameter_is_url_encoded():
             log_fn=lambda msg: None,
         )
 
-    args, _ = mock_get.call_args
-    url = args[0]
+    args, _ = mock_request.call_args
+    url = args[1]
     assert url == "https://example.test/widgets/abc%2Fdef%23frag"
@@ -0,0 +1,101 @@
+"""Tests for retrying transient failures on the agent's API calls."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from policyengine_api import agent_sandbox
+from policyengine_api.agent_sandbox import send_with_retry
+
+
+@pytest.fixture(autouse=True)
+def no_backoff_sleep():
+    with patch.object(agent_sandbox.time, "sleep") as mock_sleep:
+        yield mock_sleep
+
+
+def _response(status_code: int) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    return resp
+
+
+def test_gateway_errors_are_retried_until_success():
+    send = MagicMock(side_effect=[_response(503), _response(502), _response(200)])
+
+    resp = send_with_retry(send)
+
+    assert resp.status_code == 200
+    assert send.call_count == 3
+
+
+def test_connection_errors_are_retried():
+    send = MagicMock(side_effect=[requests.ConnectionError(), _response(200)])
+
+    assert send_with_retry(send).status_code == 200
+
+
+def test_gives_up_after_max_retries():
+    send = MagicMock(return_value=_response(503))
+
+    resp = send_with_retry(send)
+
+    assert resp.status_code == 503
+    assert send.call_count == agent_sandbox.API_MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried():
+    send = MagicMock(return_value=_response(404))
+
+    assert send_with_retry(send).status_code == 404
+    send.assert_called_once()
+
+
+def test_non_idempotent_requests_are_sent_once():
+    send = MagicMock(side_effect=requests.ConnectionError())
+
+    with pytest.raises(requests.ConnectionError):
+        send_with_retry(send, retry=False)
+    send.assert_called_once()
+
+
+def test_post_tool_calls_are_not_retried():
+    tool = {
+        "name": "create_policy",
+        "_meta": {"path": "/policies/", "method": "post", "parameters": []},
+    }
+
+    with patch.object(
+        agent_sandbox._session, "request", return_value=_response(503)
+    ) as mock_request:
+        agent_sandbox.execute_api_tool(
+            tool=tool,
+            tool_input={"name": "reform"},
+            api_base_url="https://example.test",
+            log_fn=lambda msg: None,
+        )
+
+    mock_request.assert_called_once()
+    args, kwargs = mock_request.call_args
+    assert args[0] == "POST"
+    assert kwargs["data"] == b'{"name":"reform"}'
+
+
+def test_retries_stop_at_the_deadline(no_backoff_sleep):
+    send = MagicMock(return_value=_response(503))
+
+    resp = send_with_retry(send, deadline=agent_sandbox.time.monotonic())
+
+    assert resp.status_code == 503
+    send.assert_called_once()
+    no_backoff_sleep.assert_not_called()
+
+
+def test_connection_errors_are_raised_at_the_deadline(no_backoff_sleep):
+    send = MagicMock(side_effect=requests.ConnectionError())
+
+    with pytest.raises(requests.ConnectionError):
+        send_with_retry(send, deadline=agent_sandbox.time.monotonic())
+    send.assert_called_once()
+    no_backoff_sleep.assert_not_called()
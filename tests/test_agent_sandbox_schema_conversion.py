@@ -0,0 +1,130 @@
+"""Tests for converting OpenAPI schemas into Claude tool input schemas."""
+
+from policyengine_api.agent_sandbox import (
+    openapi_to_claude_tools,
+    schema_to_json_schema,
+)
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "CountryId": {"type": "string", "enum": ["uk", "us"]},
+            "Person": {
+                "type": "object",
+                "properties": {"age": {"type": "integer"}},
+                "required": ["age"],
+            },
+        }
+    },
+    "paths": {
+        "/parameters/": {
+            "get": {
+                "operationId": "list_parameters",
+                "parameters": [
+                    {
+                        "name": "country_id",
+                        "in": "query",
+                        "description": "Country",
+                        "schema": {"$ref": "#/components/schemas/CountryId"},
+                    }
+                ],
+            }
+        },
+        "/datasets/": {
+            "get": {
+                "operationId": "list_datasets",
+                "parameters": [
+                    {
+                        "name": "country_id",
+                        "in": "query",
+                        "schema": {"$ref": "#/components/schemas/CountryId"},
+                    }
+                ],
+            }
+        },
+    },
+}
+
+
+def test_shared_cache_matches_uncached_conversion():
+    schema = {
+        "type": "object",
+        "properties": {
+            "adult": {"$ref": "#/components/schemas/Person"},
+            "child": {"$ref": "#/components/schemas/Person"},
+        },
+    }
+    cache: dict = {}
+
+    cached = schema_to_json_schema(SPEC, schema, cache)
+
+    assert cached == schema_to_json_schema(SPEC, schema)
+    assert cached["properties"]["adult"] is cached["properties"]["child"]
+    assert set(cache) == {"#/components/schemas/Person"}
+
+
+def test_parameter_descriptions_do_not_leak_between_tools():
+    tools = {t["name"]: t for t in openapi_to_claude_tools(SPEC)}
+
+    params = tools["list_parameters"]["input_schema"]["properties"]["country_id"]
+    datasets = tools["list_datasets"]["input_schema"]["properties"]["country_id"]
+
+    assert params["description"] == "Country (in: query)"
+    assert datasets["description"] == " (in: query)"
+    assert params["enum"] == datasets["enum"] == ["uk", "us"]
+
+
+def test_parameters_are_grouped_by_location():
+    meta = openapi_to_claude_tools(SPEC)[0]["_meta"]
+
+    assert meta["path_params"] == ()
+    assert meta["query_params"] == ("country_id",)
+    assert meta["header_params"] == ()
+    assert meta["param_names"] == frozenset({"country_id"})
+
+
+def test_required_fields_keep_their_order():
+    spec = {
+        "paths": {
+            "/policies/": {
+                "post": {
+                    "operationId": "create_policy",
+                    "parameters": [
+                        {"name": "z", "in": "query", "required": True},
+                    ],
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "b": {"type": "string"},
+                                        "a": {"type": "string"},
+                                        "z": {"type": "string"},
+                                    },
+                                    "required": ["b", "a", "z"],
+                                }
+                            }
+                        }
+                    },
+                }
+            }
+        }
+    }
+
+    (tool,) = openapi_to_claude_tools(spec)
+
+    assert tool["input_schema"]["required"] == ["z", "b", "a"]
+
+
+def test_optional_schema_uses_first_non_null_alternative():
+    schema = {
+        "description": "Year",
+        "anyOf": [{"type": "null"}, {"type": "integer"}, {"type": "string"}],
+    }
+
+    assert schema_to_json_schema(SPEC, schema) == {
+        "description": "Year",
+        "type": "integer",
+    }
+    assert schema_to_json_schema(SPEC, {}) == {}
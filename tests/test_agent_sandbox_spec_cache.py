@@ -0,0 +1,75 @@
+"""Tests for reusing the OpenAPI spec and derived tools across agent runs."""
+
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from policyengine_api import agent_sandbox
+
+BASE_URL = "https://example.test"
+SPEC = {
+    "paths": {
+        "/items/": {"get": {"operationId": "list_items", "parameters": []}},
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    with (
+        patch.dict(agent_sandbox._spec_cache, clear=True),
+        patch.dict(agent_sandbox._tools_cache, clear=True),
+    ):
+        yield
+
+
+def _response(status_code=200, body=None, etag=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.headers = {"ETag": etag} if etag else {}
+    resp.content = orjson.dumps(body)
+    return resp
+
+
+def test_fresh_spec_is_not_refetched():
+    with patch.object(
+        agent_sandbox._session, "get", return_value=_response(body=SPEC)
+    ) as mock_get:
+        first = agent_sandbox.fetch_openapi_spec(BASE_URL)
+        second = agent_sandbox.fetch_openapi_spec(BASE_URL)
+
+    assert first is second
+    assert mock_get.call_count == 1
+
+
+def test_stale_spec_is_revalidated_with_etag():
+    with patch.object(
+        agent_sandbox._session,
+        "get",
+        side_effect=[_response(body=SPEC, etag='"v1"'), _response(304)],
+    ) as mock_get:
+        first = agent_sandbox.fetch_openapi_spec(BASE_URL)
+        with patch.object(agent_sandbox, "SPEC_CACHE_TTL_SECONDS", 0):
+            second = agent_sandbox.fetch_openapi_spec(BASE_URL)
+
+    assert second is first
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+def test_tools_are_rebuilt_only_when_spec_changes():
+    spec = dict(SPEC)
+    with patch.object(
+        agent_sandbox,
+        "openapi_to_claude_tools",
+        wraps=agent_sandbox.openapi_to_claude_tools,
+    ) as mock_convert:
+        tools, lookup = agent_sandbox.build_agent_tools(BASE_URL, spec)
+        again, _ = agent_sandbox.build_agent_tools(BASE_URL, spec)
+        agent_sandbox.build_agent_tools(BASE_URL, {"paths": {}})
+
+    assert again is tools
+    assert mock_convert.call_count == 2
+    assert set(lookup) == {"list_items"}
+    assert tools[-1] is agent_sandbox.SLEEP_TOOL
+    assert all("_meta" not in t for t in tools)
@@ -0,0 +1,215 @@
+"""Tests for the agent loop consuming streamed Claude responses."""
+
+import copy
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from policyengine_api import agent_sandbox
+
+
+class _FakeStream:
+    """Minimal stand-in for ``anthropic``'s ``MessageStream`` context manager."""
+
+    def __init__(self, message, on_iter=None):
+        self._message = message
+        self._on_iter = on_iter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for block in self._message.content:
+            if self._on_iter:
+                self._on_iter(block)
+            yield SimpleNamespace(type="content_block_stop", content_block=block)
+
+    def get_final_message(self):
+        return self._message
+
+
+def _text_message(text: str):
+    return SimpleNamespace(
+        stop_reason="end_turn",
+        content=[SimpleNamespace(type="text", text=text)],
+    )
+
+
+def test_run_agent_uses_streaming_and_returns_final_text():
+    """The loop reads the turn from ``messages.stream`` and returns its text."""
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.return_value = _FakeStream(_text_message("Four."))
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        result = agent_sandbox._run_agent_impl("What is 2 + 2?", max_turns=3)
+
+    assert result == {"status": "completed", "result": "Four.", "turns": 1}
+    client.messages.create.assert_not_called()
+    assert client.messages.stream.call_count == 1
+
+
+def test_text_blocks_are_logged_as_they_complete(capsys):
+    """Each block is logged while the stream is still being consumed."""
+    seen_during_stream = []
+
+    def on_iter(_block):
+        seen_during_stream.append(capsys.readouterr().out)
+
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.return_value = _FakeStream(
+        SimpleNamespace(
+            stop_reason="end_turn",
+            content=[
+                SimpleNamespace(type="text", text="first"),
+                SimpleNamespace(type="text", text="second"),
+            ],
+        ),
+        on_iter=on_iter,
+    )
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        agent_sandbox._run_agent_impl("Hi", max_turns=1)
+
+    # By the time the second block is yielded, the first has been logged.
+    assert "[ASSISTANT] first" in seen_during_stream[1]
+
+
+def test_anthropic_client_is_reused_across_runs():
+    """The client (and its connection pool) is built once per process."""
+    with (
+        patch.object(agent_sandbox, "_client", None),
+        patch.object(agent_sandbox.anthropic, "Anthropic") as mock_cls,
+    ):
+        first = agent_sandbox._get_client()
+        second = agent_sandbox._get_client()
+
+    assert first is second
+    mock_cls.assert_called_once_with(max_retries=agent_sandbox.ANTHROPIC_MAX_RETRIES)
+
+
+def test_system_prompt_is_sent_with_cache_breakpoint():
+    """The static tools + system prefix is marked for prompt caching."""
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.return_value = _FakeStream(_text_message("ok"))
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        agent_sandbox._run_agent_impl("Hi", max_turns=1)
+
+    system = client.messages.stream.call_args.kwargs["system"]
+    assert system[-1]["text"] == agent_sandbox.SYSTEM_PROMPT
+    assert system[-1]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_run_stops_when_time_budget_is_spent():
+    """No new turn starts once the wall-clock budget is used up."""
+    client = MagicMock()
+    client.with_options.return_value = client
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        result = agent_sandbox._run_agent_impl("Hi", max_turns=3, time_budget=0)
+
+    assert result == {"status": "completed", "result": None, "turns": 0}
+    client.messages.stream.assert_not_called()
+
+
+def test_cache_breakpoint_moves_to_newest_tool_result():
+    """Only the latest tool result carries a cache breakpoint."""
+    turns = [
+        SimpleNamespace(
+            stop_reason="tool_use",
+            content=[SimpleNamespace(type="tool_use", id=str(i), name="x", input={})],
+        )
+        for i in range(2)
+    ] + [_text_message("Done.")]
+    sent = []
+
+    def stream(**kwargs):
+        sent.append(copy.deepcopy(kwargs["messages"]))
+        return _FakeStream(turns[len(sent) - 1])
+
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.side_effect = stream
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        agent_sandbox._run_agent_impl("Hi", max_turns=3)
+
+    results = [m["content"][0] for m in sent[-1] if isinstance(m["content"], list)]
+    results = [r for r in results if isinstance(r, dict)]
+    assert [r["tool_use_id"] for r in results] == ["0", "1"]
+    assert "cache_control" not in results[0]
+    assert results[1]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_sleep_tool_is_capped_by_time_left():
+    """The sleep tool never waits past the run's remaining budget."""
+    with patch.object(agent_sandbox.time, "sleep") as mock_sleep:
+        result = agent_sandbox.LOCAL_TOOL_HANDLERS["sleep"](
+            {"seconds": 30}, lambda msg: None, 2.5
+        )
+
+    mock_sleep.assert_called_once_with(2.5)
+    assert result == "Slept for 2.5 seconds"
+
+
+def test_claude_attempts_fit_in_the_time_left():
+    """Attempt timeout times attempts never exceeds the remaining budget."""
+    for budget in [15, 59.5, 121, 300, 570]:
+        options = agent_sandbox._claude_request_options(budget)
+        attempts = options["max_retries"] + 1
+        assert options["timeout"] * attempts <= budget
+        assert options["max_retries"] <= agent_sandbox.ANTHROPIC_MAX_RETRIES
+
+
+def test_turn_request_is_bounded_by_the_budget():
+    """Each turn's Claude call gets a timeout no longer than the time left."""
+    client = MagicMock()
+    client.with_options.return_value = client
+    client.messages.stream.return_value = _FakeStream(_text_message("ok"))
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        agent_sandbox._run_agent_impl("Hi", max_turns=1, time_budget=40)
+
+    options = client.with_options.call_args.kwargs
+    assert options["timeout"] <= 40
+    assert options["max_retries"] == 0
+
+
+def test_turn_is_skipped_when_too_little_time_is_left():
+    client = MagicMock()
+
+    with (
+        patch.object(agent_sandbox, "fetch_openapi_spec", return_value={}),
+        patch.object(agent_sandbox, "_get_client", return_value=client),
+    ):
+        result = agent_sandbox._run_agent_impl(
+            "Hi",
+            max_turns=3,
+            time_budget=agent_sandbox.CLAUDE_MIN_TURN_SECONDS - 1,
+        )
+
+    assert result["turns"] == 0
+    client.with_options.assert_not_called()
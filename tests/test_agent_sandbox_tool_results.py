@@ -0,0 +1,125 @@
+"""Tests for how agent API tool responses are rendered for Claude."""
+
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from policyengine_api import agent_sandbox
+from policyengine_api.agent_sandbox import execute_api_tool
+
+TOOL = {
+    "name": "list_items",
+    "_meta": {"path": "/items/", "method": "get", "parameters": []},
+}
+
+
+@pytest.fixture(autouse=True)
+def no_cached_get_results():
+    with patch.dict(agent_sandbox._get_results, clear=True):
+        yield
+
+
+def _call_with_response(body: bytes, text: str = "") -> str:
+    fake_resp = MagicMock()
+    fake_resp.status_code = 200
+    fake_resp.content = body
+    fake_resp.text = text or body.decode()
+
+    with patch.object(agent_sandbox._session, "request", return_value=fake_resp):
+        return execute_api_tool(
+            tool=TOOL,
+            tool_input={},
+            api_base_url="https://example.test",
+            log_fn=lambda msg: None,
+        )
+
+
+def test_json_results_are_compact():
+    result = _call_with_response(b'{"name": "x", "values": [1, 2]}')
+    assert result == '{"name":"x","values":[1,2]}'
+
+
+def test_long_lists_are_summarised():
+    body = ("[" + ",".join(str(i) for i in range(60)) + "]").encode()
+    result = _call_with_response(body)
+    assert result.startswith("[0,1,2")
+    assert result.endswith("... (10 more items)")
+
+
+def test_non_json_body_falls_back_to_text():
+    result = _call_with_response(b"plain text", text="plain text")
+    assert result == "plain text"
+
+
+def test_large_results_are_shrunk():
+    body = orjson.dumps(
+        {
+            "description": "x" * 20_000,
+            "people": [{"id": i} for i in range(50)],
+            "values": list(range(5_000)),
+        }
+    )
+    result = orjson.loads(_call_with_response(body))
+
+    assert result["description"] == "<truncated: 20000 chars>"
+    assert result["people"][-1] == "... (40 more items)"
+    assert len(result["people"]) == 11
+    assert len(result["values"]) == 201
+
+
+def test_results_still_too_large_are_cut():
+    body = orjson.dumps({f"key_{i}": i for i in range(5_000)})
+    result = _call_with_response(body)
+
+    assert len(result) < agent_sandbox.TOOL_RESULT_MAX_CHARS + 50
+    assert result.endswith("chars)")
+
+
+def _get_twice(tool: dict) -> tuple[list[str], MagicMock]:
+    fake_resp = MagicMock()
+    fake_resp.status_code = 200
+    fake_resp.content = b'{"status": "running"}'
+
+    with patch.object(
+        agent_sandbox._session, "request", return_value=fake_resp
+    ) as mock_request:
+        results = [
+            execute_api_tool(
+                tool=tool,
+                tool_input={"id": "abc"},
+                api_base_url="https://example.test",
+                log_fn=lambda msg: None,
+            )
+            for _ in range(2)
+        ]
+    return results, mock_request
+
+
+def test_identical_reference_gets_share_a_recent_response():
+    tool = {
+        "name": "get_parameter",
+        "_meta": {
+            "path": "/parameters/{id}",
+            "method": "get",
+            "parameters": [{"name": "id", "in": "path"}],
+        },
+    }
+    results, mock_request = _get_twice(tool)
+
+    assert results[0] == results[1] == '{"status":"running"}'
+    mock_request.assert_called_once()
+
+
+def test_status_polls_are_never_served_from_cache():
+    tool = {
+        "name": "get_economic_impact_status",
+        "_meta": {
+            "path": "/analysis/economic-impact/{id}",
+            "method": "get",
+            "parameters": [{"name": "id", "in": "path"}],
+        },
+    }
+    _results, mock_request = _get_twice(tool)
+
+    assert mock_request.call_count == 2
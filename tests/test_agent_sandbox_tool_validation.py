@@ -0,0 +1,48 @@
+"""Tests for validating agent tool input before calling the API."""
+
+from unittest.mock import patch
+
+from policyengine_api import agent_sandbox
+from policyengine_api.agent_sandbox import execute_api_tool, validate_tool_input
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "country_id": {"type": "string", "enum": ["uk", "us"]},
+        "search": {"type": "string"},
+    },
+    "required": ["country_id"],
+}
+
+
+def test_valid_input_passes():
+    assert validate_tool_input(SCHEMA, {"country_id": "uk", "search": "x"}) is None
+
+
+def test_missing_required_field_is_reported():
+    error = validate_tool_input(SCHEMA, {"search": "x"})
+    assert error == "missing required field(s): country_id"
+
+
+def test_value_outside_enum_is_reported():
+    error = validate_tool_input(SCHEMA, {"country_id": "fr"})
+    assert "country_id must be one of ['uk', 'us']" in error
+
+
+def test_invalid_input_skips_http_request():
+    tool = {
+        "name": "list_parameters",
+        "input_schema": SCHEMA,
+        "_meta": {"path": "/parameters/", "method": "get", "parameters": []},
+    }
+
+    with patch.object(agent_sandbox._session, "request") as mock_request:
+        result = execute_api_tool(
+            tool=tool,
+            tool_input={"search": "allowance"},
+            api_base_url="https://example.test",
+            log_fn=lambda msg: None,
+        )
+
+    assert result.startswith("Invalid arguments: missing required field")
+    mock_request.assert_not_called()
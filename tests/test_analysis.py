@@ -26,6 +26,9 @@ from policyengine_api.models import (
     SimulationType,
     TaxBenefitModel,
 )
+from test_fixtures.fixtures_economic_impact_response import (
+    create_report_with_simulations,
+)
 from test_fixtures.fixtures_regions import (
     create_dataset,
     create_region,
@@ -653,6 +656,37 @@ class TestGetOrCreateSimulation:
 
         assert first_sim.id == second_sim.id
 
+    def test__given_new_simulation__then_insert_is_not_reselected(
+        self, session: Session
+    ):
+        from sqlalchemy import event
+
+        model = create_tax_benefit_model(session, name="policyengine-uk")
+        model_version = create_tax_benefit_model_version(session, model)
+        dataset = create_dataset(session, model, name="uk_enhanced_frs")
+        dataset_id, model_version_id = dataset.id, model_version.id
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            _get_or_create_simulation(
+                simulation_type=SimulationType.ECONOMY,
+                dataset_id=dataset_id,
+                model_version_id=model_version_id,
+                policy_id=None,
+                dynamic_id=None,
+                session=session,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        # One lookup for an existing row, then the INSERT; no refresh
+        assert [s.split()[0] for s in statements] == ["SELECT", "INSERT"]
+
     def test__given_different_filter__then_creates_new_simulation(
         self, session: Session
     ):
@@ -1142,5 +1176,114 @@ class TestEconomicImpactIntegration:
         assert reform_sim.status == "completed"
 
 
+# ---------------------------------------------------------------------------
+# Local economy comparison dispatch
+# ---------------------------------------------------------------------------
+
+
+class TestLocalEconomyComparisonDispatch:
+    """Local runs are queued behind the response, not run in the request."""
+
+    def test__given_background_tasks__then_local_run_is_queued(self, session: Session):
+        from unittest.mock import patch
+
+        from fastapi import BackgroundTasks
+
+        from policyengine_api.api import analysis
+
+        background_tasks = BackgroundTasks()
+        with (
+            patch.object(analysis.settings, "agent_use_modal", False),
+            patch.object(analysis, "_run_local_economy_comparison_uk") as mock_run,
+        ):
+            analysis._trigger_economy_comparison(
+                str(uuid4()), "uk", session, background_tasks=background_tasks
+            )
+
+        mock_run.assert_not_called()
+        assert len(background_tasks.tasks) == 1
+        assert (
+            background_tasks.tasks[0].func is analysis._run_local_economy_comparison_bg
+        )
+
+    def test__given_background_run_fails__then_report_is_marked_failed(
+        self, session: Session
+    ):
+        from unittest.mock import patch
+
+        from policyengine_api.api import analysis
+        from policyengine_api.models import Report, ReportStatus
+
+        report = Report(label="test", status=ReportStatus.PENDING)
+        session.add(report)
+        session.commit()
+
+        def fail(job_id, run_session, modules=None):
+            assert run_session is not session
+            raise RuntimeError("simulation exploded")
+
+        with patch.object(
+            analysis, "_run_local_economy_comparison_uk", side_effect=fail
+        ):
+            analysis._run_local_economy_comparison_bg(
+                str(report.id), "uk", session.get_bind()
+            )
+
+        session.refresh(report)
+        assert report.status == ReportStatus.FAILED
+        assert report.error_message == "simulation exploded"
+
+    def test__given_background_run_fails__then_unfinished_simulations_fail(
+        self, session: Session
+    ):
+        from unittest.mock import patch
+
+        from policyengine_api.api import analysis
+        from policyengine_api.models import ReportStatus
+
+        report, baseline_sim, reform_sim = create_report_with_simulations(
+            session, status=ReportStatus.RUNNING
+        )
+        baseline_sim.status = SimulationStatus.RUNNING
+        session.add(baseline_sim)
+        session.commit()
+
+        with patch.object(
+            analysis,
+            "_run_local_economy_comparison_uk",
+            side_effect=RuntimeError("simulation exploded"),
+        ):
+            analysis._run_local_economy_comparison_bg(
+                str(report.id), "uk", session.get_bind()
+            )
+
+        session.refresh(baseline_sim)
+        session.refresh(reform_sim)
+        assert baseline_sim.status == SimulationStatus.FAILED
+        assert baseline_sim.error_message == "simulation exploded"
+        # A simulation another report already completed is left intact
+        assert reform_sim.status == SimulationStatus.COMPLETED
+
+
+class TestParamLookupFor:
+    """The parameter lookup is built once per runtime model version."""
+
+    def test__given_same_model_version__then_lookup_is_reused(self):
+        from types import SimpleNamespace
+
+        from policyengine_api.api.analysis import _param_lookup_for
+
+        model_version = SimpleNamespace(
+            parameters=[SimpleNamespace(name="gov.a"), SimpleNamespace(name="gov.b")]
+        )
+
+        first = _param_lookup_for(model_version)
+        model_version.parameters = []
+        second = _param_lookup_for(model_version)
+
+        assert first is second
+        assert set(first) == {"gov.a", "gov.b"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+"""Tests for streaming local dataset downloads in the analysis router."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from policyengine_api.api import analysis
+
+
+class _FakeResponse:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_bytes(self, chunk_size):
+        yield from self._chunks
+
+
+class _FailingResponse(_FakeResponse):
+    def iter_bytes(self, chunk_size):
+        yield b"partial"
+        raise OSError("connection reset")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, "DATASET_CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+def _client():
+    client = MagicMock()
+    client.storage.from_.return_value.create_signed_url.return_value = {
+        "signedURL": "https://storage.example/signed"
+    }
+    return client
+
+
+def test_download_streams_chunks_into_cache(cache_dir):
+    """The dataset is written chunk by chunk and renamed into place."""
+    client = _client()
+    with (
+        patch("supabase.create_client", return_value=client),
+        patch.object(
+            analysis.httpx, "stream", return_value=_FakeResponse([b"ab", b"cd"])
+        ) as mock_stream,
+    ):
+        path = analysis._download_dataset_local("uk/frs.h5")
+
+    assert open(path, "rb").read() == b"abcd"
+    mock_stream.assert_called_once_with(
+        "GET",
+        "https://storage.example/signed",
+        timeout=analysis.DATASET_DOWNLOAD_TIMEOUT,
+    )
+    client.storage.from_.return_value.download.assert_not_called()
+    assert not (cache_dir / "uk" / "frs.h5.tmp").exists()
+
+
+def test_failed_download_leaves_no_cache_entry(cache_dir):
+    """A broken stream never leaves a half-written file at the cache path."""
+    with (
+        patch("supabase.create_client", return_value=_client()),
+        patch.object(analysis.httpx, "stream", return_value=_FailingResponse([])),
+        pytest.raises(OSError),
+    ):
+        analysis._download_dataset_local("uk/frs.h5")
+
+    assert not (cache_dir / "uk" / "frs.h5").exists()
+    assert not (cache_dir / "uk" / "frs.h5.tmp").exists()
+
+
+def test_download_timeout_is_bounded():
+    """A stalled transfer times out rather than holding the lock forever."""
+    timeout = analysis.DATASET_DOWNLOAD_TIMEOUT
+    assert timeout.connect == 10
+    assert timeout.read == 60
+
+
+def test_timed_out_download_removes_partial_file(cache_dir):
+    """A read timeout mid-stream cleans up the temporary file."""
+
+    class _StalledResponse(_FakeResponse):
+        def iter_bytes(self, chunk_size):
+            yield b"partial"
+            raise analysis.httpx.ReadTimeout("stalled")
+
+    with (
+        patch("supabase.create_client", return_value=_client()),
+        patch.object(analysis.httpx, "stream", return_value=_StalledResponse([])),
+        pytest.raises(analysis.httpx.ReadTimeout),
+    ):
+        analysis._download_dataset_local("uk/frs.h5")
+
+    assert not (cache_dir / "uk" / "frs.h5").exists()
+    assert not (cache_dir / "uk" / "frs.h5.tmp").exists()
+
+
+def test_cached_dataset_is_not_downloaded_again(cache_dir):
+    """An existing cache entry is returned without touching storage."""
+    (cache_dir / "frs.h5").write_bytes(b"cached")
+    with patch("supabase.create_client") as mock_create:
+        path = analysis._download_dataset_local("frs.h5")
+
+    assert open(path, "rb").read() == b"cached"
+    mock_create.assert_not_called()
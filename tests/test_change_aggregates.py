@@ -57,6 +57,24 @@ def test_create_multiple_change_aggregates(mock_modal, client, simulation_id):
     assert len(data) == 2
 
 
+def test_create_change_aggregates_unknown_reform(mock_modal, client, simulation_id):
+    """A batch naming a missing reform simulation is rejected with 404."""
+    fake_id = str(uuid4())
+    response = client.post(
+        "/outputs/change-aggregates",
+        json=[
+            {
+                "baseline_simulation_id": simulation_id,
+                "reform_simulation_id": fake_id,
+                "variable": "net_income",
+                "aggregate_type": "sum",
+            }
+        ],
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Reform simulation {fake_id} not found"
+
+
 def test_get_change_aggregate_not_found(client):
     """Get non-existent change aggregate returns 404."""
     fake_id = uuid4()
@@ -4,7 +4,15 @@ Covers all Phase 2 output fields: poverty, inequality, budget_summary,
 intra_decile, program_statistics, detailed_budget, and decile_impacts.
 """
 
-from policyengine_api.api.analysis import _build_response, _safe_float
+import pytest
+from fastapi import HTTPException
+
+from policyengine_api.api.analysis import (
+    _build_response,
+    _load_report_simulation_statuses,
+    _load_report_simulations,
+    _safe_float,
+)
 from policyengine_api.models import ReportStatus
 from test_fixtures.fixtures_economic_impact_response import (
     BUDGET_VARIABLES_UK,
@@ -682,3 +690,84 @@ class TestBuildResponseIntraWealthDecile:
 
         decile_numbers = {r.decile for r in response.intra_wealth_decile}
         assert 0 in decile_numbers
+
+
+# ---------------------------------------------------------------------------
+# _load_report_simulations
+# ---------------------------------------------------------------------------
+
+
+class TestLoadReportSimulations:
+    """Tests for loading a report's two simulations together."""
+
+    def test__given_report__then_returns_baseline_and_reform(self, session):
+        report, baseline_sim, reform_sim = create_report_with_simulations(session)
+
+        loaded = _load_report_simulations(report, session)
+
+        assert [sim.id for sim in loaded] == [baseline_sim.id, reform_sim.id]
+
+    def test__given_status_load__then_returns_detached_rows(self, session):
+        from policyengine_api.models import Simulation
+
+        report, baseline_sim, reform_sim = create_report_with_simulations(session)
+
+        baseline, reform = _load_report_simulation_statuses(report, session)
+
+        assert (baseline.id, reform.id) == (baseline_sim.id, reform_sim.id)
+        assert baseline.status == baseline_sim.status
+        assert baseline.region_id == baseline_sim.region_id
+        assert not isinstance(baseline, Simulation)
+        with pytest.raises(AttributeError):
+            baseline.status = "failed"
+
+    def test__given_missing_reform__then_raises_500(self, session):
+        report, _baseline_sim, reform_sim = create_report_with_simulations(session)
+        session.delete(reform_sim)
+        session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            _load_report_simulations(report, session)
+
+        assert exc_info.value.status_code == 500
+
+
+# ---------------------------------------------------------------------------
+# GET /analysis/economic-impact/{report_id} conditional polling
+# ---------------------------------------------------------------------------
+
+
+class TestEconomicImpactStatusETag:
+    """Status polls carry an ETag and honour If-None-Match."""
+
+    def test__given_matching_etag__then_returns_304(self, client, session):
+        report, _baseline_sim, _reform_sim = create_report_with_simulations(
+            session, status=ReportStatus.RUNNING
+        )
+        url = f"/analysis/economic-impact/{report.id}"
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        second = client.get(url, headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "no-cache"
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test__given_status_change__then_etag_changes(self, client, session):
+        report, _baseline_sim, _reform_sim = create_report_with_simulations(
+            session, status=ReportStatus.RUNNING
+        )
+        url = f"/analysis/economic-impact/{report.id}"
+        etag = client.get(url).headers["etag"]
+
+        report.status = ReportStatus.COMPLETED
+        session.add(report)
+        session.commit()
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == ReportStatus.COMPLETED.value
+        assert response.headers["etag"] != etag
@@ -6,3 +6,11 @@ def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+def test_large_responses_are_gzipped(client):
+    """The OpenAPI spec is served compressed when the client accepts gzip."""
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "paths" in response.json()
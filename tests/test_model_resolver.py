@@ -4,6 +4,7 @@ from uuid import uuid4
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
 from policyengine_api.models import (
     Simulation,
@@ -63,6 +64,30 @@ class TestResolveCountryModel:
         assert result_model.id == model.id
         assert result_version.id == v2.id
 
+    def test_resolves_in_a_single_query(self, session):
+        model = TaxBenefitModel(name="policyengine-us", description="US")
+        session.add(model)
+        session.commit()
+        session.add(
+            TaxBenefitModelVersion(model_id=model.id, version="1.0", description="V1")
+        )
+        session.commit()
+        session.expire_all()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            resolve_country_model("us", session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+
     def test_missing_model_raises_404(self, session):
         with pytest.raises(HTTPException) as exc_info:
             resolve_country_model("us", session)
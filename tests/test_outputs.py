@@ -61,6 +61,28 @@ def test_create_multiple_aggregates(mock_modal, client, simulation_id):
     assert variables == {"income_tax", "household_count", "mean_income"}
 
 
+def test_create_aggregates_unknown_simulation(mock_modal, client, simulation_id):
+    """A batch naming a missing simulation is rejected with 404."""
+    fake_id = str(uuid4())
+    response = client.post(
+        "/outputs/aggregates",
+        json=[
+            {
+                "simulation_id": simulation_id,
+                "variable": "net_income",
+                "aggregate_type": "sum",
+            },
+            {
+                "simulation_id": fake_id,
+                "variable": "net_income",
+                "aggregate_type": "sum",
+            },
+        ],
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Simulation {fake_id} not found"
+
+
 def test_get_aggregate_not_found(client):
     """Get non-existent aggregate returns 404."""
     fake_id = uuid4()
@@ -2,7 +2,7 @@
 
 from uuid import uuid4
 
-from policyengine_api.models import Policy
+from policyengine_api.models import Parameter, Policy, TaxBenefitModelVersion
 
 
 def test_list_policies_empty(client):
@@ -30,6 +30,61 @@ def test_create_policy(client, tax_benefit_model):
     assert "id" in data
 
 
+def test_create_policy_with_parameter_values(client, session, tax_benefit_model):
+    """Create a policy together with its parameter values."""
+    version = TaxBenefitModelVersion(
+        model_id=tax_benefit_model.id, version="1.0", description="v1"
+    )
+    session.add(version)
+    session.commit()
+    params = [
+        Parameter(name=f"gov.param_{i}", tax_benefit_model_version_id=version.id)
+        for i in range(2)
+    ]
+    session.add_all(params)
+    session.commit()
+
+    response = client.post(
+        "/policies",
+        json={
+            "name": "Test policy",
+            "tax_benefit_model_id": str(tax_benefit_model.id),
+            "parameter_values": [
+                {
+                    "parameter_id": str(param.id),
+                    "value_json": i,
+                    "start_date": "2026-01-01T00:00:00Z",
+                }
+                for i, param in enumerate(params)
+            ],
+        },
+    )
+    assert response.status_code == 200
+    values = response.json()["parameter_values"]
+    assert sorted(v["parameter_name"] for v in values) == ["gov.param_0", "gov.param_1"]
+
+
+def test_create_policy_unknown_parameter(client, tax_benefit_model):
+    """Create policy referencing a non-existent parameter returns 404."""
+    fake_id = uuid4()
+    response = client.post(
+        "/policies",
+        json={
+            "name": "Test policy",
+            "tax_benefit_model_id": str(tax_benefit_model.id),
+            "parameter_values": [
+                {
+                    "parameter_id": str(fake_id),
+                    "value_json": 1,
+                    "start_date": "2026-01-01T00:00:00Z",
+                }
+            ],
+        },
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Parameter {fake_id} not found"
+
+
 def test_create_policy_invalid_tax_benefit_model(client):
     """Create policy with non-existent tax_benefit_model returns 404."""
     fake_id = uuid4()
@@ -15,6 +15,12 @@ class TestSignedCallId:
         assert "." in call_id
         assert security.verify_signed_call_id(call_id) == call_id
 
+    def test_random_portion_is_24_hex_chars(self):
+        raw, _, _ = security.issue_signed_call_id().rpartition(".")
+        random_part = raw.removeprefix("fc-")
+        assert len(random_part) == 24
+        int(random_part, 16)
+
     def test_tampered_raw_id_rejected(self):
         call_id = security.issue_signed_call_id()
         raw, _, tag = call_id.rpartition(".")
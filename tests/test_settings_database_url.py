@@ -1,4 +1,4 @@
-"""Tests for settings.database_url fallback behaviour (#277).
+"""Tests for settings.database_url fallback behaviour (#277) and agent limits.
 
 ``tests/test_seed_utils.py`` monkey-patches ``sys.modules`` with a MagicMock
 for ``policyengine_api.config.settings``; if pytest loads that file first the
@@ -64,3 +64,21 @@ def test_override_used_when_provided():
         supabase_db_url="postgresql://u:p@host:5432/db",
     )
     assert s.database_url == "postgresql://u:p@host:5432/db"
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        "agent_max_concurrency",
+        "agent_max_concurrent_runs",
+        "agent_trace_sample_rate_denom",
+        "agent_max_logs_per_call",
+    ],
+)
+def test_agent_limits_reject_zero(field):
+    from pydantic import ValidationError
+
+    from policyengine_api.config.settings import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(**{field: 0})
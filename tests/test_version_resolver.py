@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from policyengine_api.version_resolver import (
+    _function_ref,
     _resolve_app_name,
     resolve_modal_function,
 )
@@ -12,10 +13,12 @@ from policyengine_api.version_resolver import (
 
 @pytest.fixture(autouse=True)
 def clear_lru_cache():
-    """Clear the LRU cache between tests."""
+    """Clear the LRU caches between tests."""
     _resolve_app_name.cache_clear()
+    _function_ref.cache_clear()
     yield
     _resolve_app_name.cache_clear()
+    _function_ref.cache_clear()
 
 
 class TestResolveAppName:
@@ -130,3 +133,18 @@ class TestResolveModalFunction:
             "economy_comparison_uk",
             environment_name="main",
         )
+
+    @patch("policyengine_api.version_resolver.modal.Function.from_name")
+    def test_function_handle_is_reused(self, mock_from_name):
+        """Repeated resolution returns one cached handle per function."""
+        mock_dict = MagicMock()
+        mock_dict.__getitem__ = MagicMock(return_value="app-name")
+
+        with patch("modal.Dict.from_name", return_value=mock_dict):
+            with patch("policyengine_api.config.settings") as mock_settings:
+                mock_settings.modal_environment = "main"
+                first = resolve_modal_function("economy_comparison_uk", "uk")
+                second = resolve_modal_function("economy_comparison_uk", "uk")
+
+        assert first is second
+        mock_from_name.assert_called_once()